@@ -0,0 +1,97 @@
+"""
+Measures the time and the memory the shared checkers need to check the functions of
+a generated module, excluding the parsing of the module. Run it from the root of the
+repository:
+
+    PYTHONPATH=. python tests/benchmark_checkers.py --classes 300 --repeat 10
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import List, Optional, Tuple
+
+from type_hint_checker.checkers import get_checkers
+from type_hint_checker.file_parser import FileParser
+from type_hint_checker.rules import CoverageRule, ResultSink
+
+
+def generate_module(classes: int, methods: int, annotated: bool) -> str:
+    """Returns the source of a module with the given number of classes and methods"""
+    if annotated:
+        signature = "(self, a: int, b: int, c: int = 1, *args: int, **kw: int) -> int"
+    else:
+        signature = "(self, a, b: int, c=1, *args, **kw)"
+    lines = []
+    for class_number in range(classes):
+        lines.append(f"class C{class_number}:")
+        for method_number in range(methods):
+            lines.append(f"    def m{method_number}{signature}:")
+            lines.append("        return a")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def check(file: FileParser, collect_coverage: bool) -> ResultSink:
+    """Checks the parsed module the way a single file is checked"""
+    enabled_rules = (CoverageRule.name,) if collect_coverage else ()
+    function_checker, class_checker = get_checkers("^self$", enabled_rules)
+    sink = ResultSink()
+    context = function_checker.create_context(sink)
+    for function in file.functions:
+        function_checker.check(function, context)
+    for class_ in file.classes:
+        class_checker.check(class_, context)
+    return sink
+
+
+def measure(
+    file: FileParser, collect_coverage: bool, repeat: int
+) -> Tuple[float, int, int]:
+    """
+    Measures checking the parsed module.
+    Returns
+    -------
+        Tuple[float, int, int] - mean time in milliseconds, peak traced memory in
+                                bytes and the number of memory blocks still allocated
+                                after the check, including the results
+    """
+    check(file, collect_coverage)
+    gc.collect()
+    tracemalloc.start()
+    sink = check(file, collect_coverage)
+    snapshot = tracemalloc.take_snapshot()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    blocks = sum(statistic.count for statistic in snapshot.statistics("filename"))
+    del sink
+    start = time.perf_counter()
+    for _ in range(repeat):
+        check(file, collect_coverage)
+    elapsed = (time.perf_counter() - start) / repeat * 1000
+    return elapsed, peak, blocks
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Prints the measurements for annotated and unannotated modules"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--classes", type=int, default=300)
+    parser.add_argument("--methods", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+    functions = args.classes * args.methods
+    for annotated in (True, False):
+        source = generate_module(args.classes, args.methods, annotated)
+        file = FileParser("generated.py", source=source)
+        for collect_coverage in (False, True):
+            elapsed, peak, blocks = measure(file, collect_coverage, args.repeat)
+            print(
+                f"annotated={annotated} coverage={collect_coverage}: "
+                f"{elapsed:.1f} ms, peak {peak / 1024:.0f} KiB, "
+                f"{blocks / functions:.2f} retained blocks per function"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+from typing import List, Literal
+
+
+def f(a: "List[int", b: List["str"], c: Literal["not a type"]) -> "garbage )":
+    pass
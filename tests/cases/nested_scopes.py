@@ -0,0 +1,14 @@
+class Outer:
+    limit: int = 1
+
+    class Inner:
+        def method(self, value):
+            return value
+
+    def method(self, value: int) -> int:
+        result = value
+
+        def helper(item):
+            return item
+
+        return helper(result)
@@ -0,0 +1,11 @@
+from typing import Optional
+
+
+def f1(a: int | None, b: list[dict[str, int]], c: "list[int]") -> tuple[int, ...]:
+    return (a or 0,)
+
+
+class A:
+    def f2(self, a: Optional[list[int]]) -> None:
+        if n := a:
+            print(n)
@@ -1,7 +1,10 @@
+import logging
 import subprocess
 
 import pytest
 
+from type_hint_checker.main import Runner, main
+
 NO_RETURN = "tests/cases/no_return.py"
 MIXED_ARGS = "tests/cases/mixed_parameters.py"
 NO_ARGS = "tests/cases/no_parameters.py"
@@ -9,24 +12,23 @@ NOT_A_FUNCTION = "tests/cases/not_a_function.py"
 MIXED_ARGS_WITH_RETURN = "tests/cases/mixed_parameters_with_return.py"
 DIFFERENT_COMMENT = "tests/cases/different_comment.py"
 
+runner = Runner()
+
 
 def test_running_cli_version() -> None:
     subprocess.run(["type_hint_checker", NO_RETURN])
 
 
 def test_exclude_files() -> None:
-    process = subprocess.run(
+    exit_code = runner.run(
         [
-            "type_hint_checker",
             r"--exclude_files=no_.*\.py",
             NO_ARGS,
             NO_RETURN,
             NOT_A_FUNCTION,
-        ],
-        capture_output=True,
-        universal_newlines=True,
+        ]
     )
-    assert process.returncode == 0
+    assert exit_code == 0
 
 
 @pytest.mark.parametrize(
@@ -40,12 +42,7 @@ def test_exclude_files() -> None:
     ],
 )
 def test_exit_code(filename: str, result: int) -> None:
-    process = subprocess.run(
-        ["type_hint_checker", filename],
-        capture_output=True,
-        universal_newlines=True,
-    )
-    assert result == process.returncode
+    assert result == runner.run([filename])
 
 
 @pytest.mark.parametrize(
@@ -57,12 +54,7 @@ def test_exit_code(filename: str, result: int) -> None:
     ],
 )
 def test_exit_code_with_exit_zero(filename: str) -> None:
-    process = subprocess.run(
-        ["type_hint_checker", filename, "--exit_zero"],
-        capture_output=True,
-        universal_newlines=True,
-    )
-    assert process.returncode == 0
+    assert runner.run([filename, "--exit_zero"]) == 0
 
 
 def test_logging_filepath() -> None:
@@ -82,16 +74,13 @@ def test_logging_filepath() -> None:
     ],
 )
 def test_exclude_parameters(pattern: str, result: int) -> None:
-    process = subprocess.run(
+    exit_code = runner.run(
         [
-            "type_hint_checker",
             MIXED_ARGS_WITH_RETURN,
             f"--exclude_parameters={pattern}",
-        ],
-        capture_output=True,
-        universal_newlines=True,
+        ]
     )
-    assert result == process.returncode
+    assert result == exit_code
 
 
 @pytest.mark.parametrize(
@@ -110,16 +99,13 @@ def test_exclude_parameters(pattern: str, result: int) -> None:
 )
 def test_exclude_by_name(input_: str, pattern: str, result: int) -> None:
     """Test excluding functions and classes by name"""
-    process = subprocess.run(
+    exit_code = runner.run(
         [
-            "type_hint_checker",
             input_,
             f"--exclude_by_name={pattern}",
-        ],
-        capture_output=True,
-        universal_newlines=True,
+        ]
     )
-    assert result == process.returncode
+    assert result == exit_code
 
 
 def test_debug_level():
@@ -133,22 +119,84 @@ def test_debug_level():
 
 
 def test_ignore_comment():
-    process = subprocess.run(
-        [
-            "type_hint_checker",
-            DIFFERENT_COMMENT,
-            "--ignore_comment=custom",
-        ],
-        capture_output=True,
-        universal_newlines=True,
+    assert runner.run([DIFFERENT_COMMENT, "--ignore_comment=custom"]) == 0
+    assert runner.run([DIFFERENT_COMMENT]) == 1
+
+
+def test_main_in_process(caplog) -> None:
+    """Test if main can be called many times in one process"""
+    with caplog.at_level(logging.INFO):
+        assert main([NO_RETURN]) == 1
+        assert main([NO_ARGS]) == 0
+        assert main([NO_RETURN, "--exit_zero"]) == 0
+    assert NO_RETURN in caplog.text
+
+
+def test_missing_file(tmp_path, caplog) -> None:
+    """Test if a missing file is reported without stopping the check"""
+    missing = str(tmp_path / "missing.py")
+    with caplog.at_level(logging.INFO):
+        assert main([missing, NO_RETURN]) == 1
+        assert main([missing, NO_ARGS, "--sample=2", "--sample-strata=2"]) == 1
+    assert f"File could not be read: {missing}" in caplog.text
+
+
+@pytest.mark.parametrize("null", [False, True])
+def test_files_from(tmp_path, null: bool) -> None:
+    separator = "\0" if null else "\n"
+    file_list = tmp_path / "files.txt"
+    file_list.write_text(separator.join([NO_ARGS, "README.md", NOT_A_FUNCTION]))
+    args = ["--files-from", str(file_list)] + (["-0"] if null else [])
+    assert runner.run(args) == 0
+    assert runner.run(args + [NO_RETURN]) == 1
+    file_list.write_text(separator.join([NO_ARGS, NO_RETURN]))
+    assert runner.run(args) == 1
+    assert runner.run(args + [r"--exclude_files=no_r"]) == 0
+
+
+def test_files_from_missing_file(tmp_path, capsys) -> None:
+    missing = str(tmp_path / "missing.txt")
+    assert runner.run(["--files-from", missing]) == 2
+    assert "--files-from: cannot read" in capsys.readouterr().err
+    assert runner.run(["--files-from", str(tmp_path)]) == 2
+
+
+def test_target_version() -> None:
+    assert runner.run([NO_ARGS, "--target-version=3.8"]) == 0
+    assert runner.run([NO_ARGS, "--target-version=2.7"]) == 2
+
+
+def test_config_precedence(tmp_path) -> None:
+    module = tmp_path / "module.py"
+    module.write_text("def f(test_a, b: int) -> None:\n    pass\n", encoding="utf-8")
+    (tmp_path / "setup.cfg").write_text(
+        "[tool:type_hint_checker]\nexclude_parameters = ^test_\n", encoding="utf-8"
     )
-    assert process.returncode == 0
-    process = subprocess.run(
-        [
-            "type_hint_checker",
-            DIFFERENT_COMMENT,
-        ],
-        capture_output=True,
-        universal_newlines=True,
+    assert Runner().run([str(module)]) == 0
+    assert Runner().run([str(module), "--exclude_parameters=^self$"]) == 1
+    assert Runner().run([str(module), "--no-config"]) == 1
+    (tmp_path / "setup.cfg").write_text(
+        "[tool:type_hint_checker]\nexclude_everything = true\n", encoding="utf-8"
+    )
+    assert Runner().run([str(module)]) == 2
+
+
+def test_usage_error_exit_code() -> None:
+    assert main([]) == 2
+    assert main(["--help"]) == 0
+
+
+def test_summary_limits_messages(tmp_path, caplog) -> None:
+    module = tmp_path / "module.py"
+    module.write_text(
+        "".join(f"def f{number}():\n    pass\n" for number in range(25)),
+        encoding="utf-8",
     )
-    assert process.returncode == 1
+    with caplog.at_level(logging.INFO):
+        assert main([str(module), "--summary"]) == 1
+    assert "5 more type hint errors were not shown" in caplog.text
+    caplog.clear()
+    with caplog.at_level(logging.INFO):
+        assert main([str(module), "--summary", "--max-messages=25"]) == 1
+    assert "not shown" not in caplog.text
+    assert "function f24" in caplog.text
@@ -1,12 +1,47 @@
+import ast
+import hashlib
+import io
 import logging
+import math
+import os
+import shutil
+import sqlite3
+import tracemalloc
+from typing import List
 
 import pathlib
 import pytest
 from pytest import fixture, raises
 
-from type_hint_checker.exceptions import IncorrectFileException
-from type_hint_checker.main import check_type_hints, filter_files
-
+from type_hint_checker.checkers import get_checkers
+from type_hint_checker.config import ConfigResolver, Settings
+from type_hint_checker.coverage import CoverageReport
+from type_hint_checker.exceptions import (
+    IncorrectConfigException,
+    IncorrectFileException,
+)
+from type_hint_checker.file_parser import FileParser
+from type_hint_checker.fixer import ReturnHintFixer
+from type_hint_checker.index import AnnotationIndex
+from type_hint_checker.main import (
+    CheckOptions,
+    check_type_hints,
+    filter_files,
+    log_estimates,
+    read_filenames,
+)
+from type_hint_checker.notebook import get_cell_name, read_code_cells, strip_magics
+from type_hint_checker.rules import (
+    CoverageRule,
+    ResultSink,
+    Rule,
+    RuleContext,
+    RuleEngine,
+    RuleRegistry,
+)
+from type_hint_checker.sampling import Sample
+from type_hint_checker.summary import CodeOwners, ViolationSummary
+from type_hint_checker.versions import uses_unsupported_syntax
 
 NO_RETURN = "tests/cases/no_return.py"
 MIXED_ARGS = "tests/cases/mixed_parameters.py"
@@ -28,6 +63,10 @@ NO_RETURN_CLASS = "tests/cases/no_return_class.py"
 PROPERLY_ANNOTATED_CLASS = "tests/cases/properly_annotated_class.py"
 STATIC_FUNCTION_CLASS = "tests/cases/static_function_class.py"
 ANNOTATED_SELF_CLASS = "tests/cases/annotated_self_class.py"
+NOTEBOOK = "tests/cases/notebook.ipynb"
+NEW_STYLE_TYPE_HINTS = "tests/cases/new_style_type_hints.py"
+MALFORMED_STRING_TYPE_HINT = "tests/cases/malformed_string_type_hint.py"
+NESTED_SCOPES = "tests/cases/nested_scopes.py"
 
 
 @fixture
@@ -72,13 +111,51 @@ def test_custom_ignore_comment(
     assert check_type_hints([input_path], ignore_comment=ignore_comment) == result
 
 
-def test_incorrect_file(incorrect_file, tmp_path: pathlib.Path) -> None:
-    """Test if passing incorrect file raises the correct error"""
+def test_incorrect_file(incorrect_file, tmp_path: pathlib.Path, caplog) -> None:
+    """Test if an incorrect file is reported without stopping the check"""
+    file = tmp_path / "file737ny73814781.py"
+    file.write_text(incorrect_file, encoding="utf-8")
+    with caplog.at_level(logging.INFO):
+        assert check_type_hints([file, NO_ARGS]) == False
+        assert check_type_hints([NO_ARGS, file]) == False
+    assert "File could not be parsed" in caplog.text
+    assert "file737ny73814781.py" in caplog.text
+
+
+def test_incorrect_file_parser(incorrect_file, tmp_path: pathlib.Path) -> None:
+    """Test if parsing an incorrect file raises the correct error"""
     file = tmp_path / "file737ny73814781.py"
     file.write_text(incorrect_file, encoding="utf-8")
     with raises(IncorrectFileException) as exception:
-        check_type_hints([file])
+        FileParser(str(file))
     assert "file737ny73814781.py" in str(exception)
+    with raises(IncorrectFileException) as exception:
+        FileParser(str(tmp_path / "missing.py"))
+    assert "File could not be read" in str(exception)
+    with raises(IncorrectFileException) as exception:
+        read_code_cells(str(tmp_path / "missing.ipynb"))
+    assert "Notebook could not be read" in str(exception)
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="requires named pipes")
+def test_timeout(tmp_path: pathlib.Path, caplog) -> None:
+    """Test if a file that cannot be read in time is reported and skipped"""
+    hanging_file = tmp_path / "hanging.py"
+    os.mkfifo(hanging_file)
+    with caplog.at_level(logging.INFO):
+        result = check_type_hints(
+            [str(hanging_file), NO_RETURN, NO_ARGS],
+            options=CheckOptions(timeout=1, jobs=2),
+        )
+    assert result == False
+    assert f"{hanging_file}: Checking timed out after 1 seconds" in caplog.text
+    assert NO_RETURN in caplog.text
+    assert (
+        check_type_hints(
+            [NO_ARGS, PROPERLY_ANNOTATED_CLASS], options=CheckOptions(timeout=5)
+        )
+        == True
+    )
 
 
 def test_filter_files() -> None:
@@ -97,6 +174,102 @@ def test_filter_files_no_exclude() -> None:
     assert filter_files(file_list, pattern) == result
 
 
+@pytest.mark.parametrize(
+    "content, separator",
+    [
+        (b"file1.py\ndir/file 2.py\r\n\nfile3.py", b"\n"),
+        (b"file1.py\0dir/file 2.py\r\0\0file3.py\0", b"\0"),
+    ],
+)
+def test_read_filenames(content: bytes, separator: bytes) -> None:
+    """Test reading newline and NUL separated filenames"""
+    result = ["file1.py", "dir/file 2.py", "file3.py"]
+    if separator == b"\0":
+        result[1] += "\r"
+    assert list(read_filenames(io.BytesIO(content), separator)) == result
+
+
+def test_read_filenames_lazily() -> None:
+    """Test if the filenames are yielded before the whole stream is read"""
+
+    class Stream:
+        def __init__(self) -> None:
+            self.chunks = [b"file1.py\nfil", b"e2.py\n"]
+
+        def read1(self, size: int) -> bytes:
+            return self.chunks.pop(0) if self.chunks else b""
+
+    stream = Stream()
+    filenames = read_filenames(stream)
+    assert next(filenames) == "file1.py"
+    assert stream.chunks == [b"e2.py\n"]
+    assert list(filenames) == ["file2.py"]
+
+
+def test_filter_files_notebooks() -> None:
+    """Test if Jupyter notebooks are not filtered out"""
+    file_list = ["file1.py", "notebook.ipynb", "notebook.ipynb.txt"]
+    assert filter_files(file_list, "") == ["file1.py", "notebook.ipynb"]
+
+
+def test_notebook(caplog) -> None:
+    """Test checking the code cells of a Jupyter notebook"""
+    with caplog.at_level(logging.INFO):
+        assert check_type_hints([NOTEBOOK]) == False
+    assert caplog.messages == [
+        f"{NOTEBOOK}: cell 2: Missing type hint for parameter a (function f1), "
+        "line 7",
+        f"{NOTEBOOK}: cell 4: Missing return type hint for function f3, line 2",
+    ]
+
+
+def test_notebook_cells() -> None:
+    """Test reading the code cells and skipping the outputs of a notebook"""
+    cells = read_code_cells(NOTEBOOK)
+    assert [cell.number for cell in cells] == [2, 3, 4]
+    assert cells[0].source.splitlines()[:4] == ["pass", "import os", "", "pass"]
+    assert cells[1].source == ""
+
+
+@pytest.mark.parametrize(
+    "source, result",
+    [
+        ("%load_ext autoreload\nx = 1", "pass\nx = 1"),
+        ("if x:\n    !pip install y\n    %time f()", "if x:\n    pass\n    pass"),
+        ("a, b = !ls\nc = %env", "pass\npass"),
+        ("os.path??\nx = 5 % 3\ny != 2", "pass\nx = 5 % 3\ny != 2"),
+        ("%%time\ndef f(): pass", "\ndef f(): pass"),
+        ("%%bash\nls", ""),
+        ("x = (a\n    % b)\n%time f()", "x = (a\n    % b)\npass"),
+        ("if (a\n    != b):\n    pass", "if (a\n    != b):\n    pass"),
+        ("y = a \\\n    % b\n!ls", "y = a \\\n    % b\npass"),
+        ('s = """\n%s\n"""\n%env', 's = """\n%s\n"""\npass'),
+    ],
+)
+def test_strip_magics(source: str, result: str) -> None:
+    assert strip_magics(source) == result
+
+
+def test_notebook_other_language(tmp_path) -> None:
+    """Test if notebooks of other languages are not checked"""
+    notebook = tmp_path / "notebook.ipynb"
+    notebook.write_text(
+        '{"cells": [{"cell_type": "code", "source": "f <- function(a) a"}], '
+        '"metadata": {"language_info": {"name": "R"}}, "nbformat": 4}'
+    )
+    assert read_code_cells(str(notebook)) == []
+    assert check_type_hints([str(notebook)]) == True
+
+
+def test_incorrect_notebook(tmp_path, caplog) -> None:
+    """Test if a notebook that is not valid JSON is reported"""
+    notebook = tmp_path / "notebook.ipynb"
+    notebook.write_text('{"cells": [{"cell_type": "code", "source": "x = 1"')
+    with caplog.at_level(logging.INFO):
+        assert check_type_hints([str(notebook)]) == False
+    assert f"Notebook could not be parsed: {notebook}" in caplog.text
+
+
 def test_filepath_in_log(caplog) -> None:
     """Test if the path to th file appears in the log"""
     with caplog.at_level(logging.INFO):
@@ -163,3 +336,648 @@ def test_exclude_self() -> None:
     assert check_type_hints([PROPERLY_ANNOTATED_CLASS], exclude_parameters="") == False
     assert check_type_hints([PROPERLY_ANNOTATED_CLASS]) == True
     assert check_type_hints([ANNOTATED_SELF_CLASS], exclude_parameters="") == True
+
+
+def test_rule_engine_dispatch() -> None:
+    """Test if a single traversal dispatches nodes to the subscribed rules"""
+
+    class ClassNameRule(Rule):
+        name = "class-name"
+        node_types = (ast.ClassDef,)
+
+        def check(self, node: ast.ClassDef, context: RuleContext) -> None:
+            context.report(f"class {'.'.join(context.scope + [node.name])}")
+
+    class MethodRule(Rule):
+        name = "method"
+        node_types = (ast.FunctionDef,)
+
+        def check(self, node: ast.FunctionDef, context: RuleContext) -> None:
+            context.report(f"method {'.'.join(context.scope + [node.name])}")
+
+    registry = RuleRegistry(entry_point_group="type_hint_checker.tests")
+    registry.register(ClassNameRule)
+    registry.register(MethodRule)
+    engine = RuleEngine(registry.get_rules())
+    context = RuleContext()
+    for class_ in FileParser(MIXED_ARGS_CLASS).classes:
+        engine.run(class_, context)
+    assert context.errors == ["class Aaaa", "method Aaaa.f1"]
+
+
+def test_rule_engine_dispatches_every_node() -> None:
+    """Test if the nodes inside class and function bodies reach the rules with
+    their scope, while nested functions are not checked by the built-in rules"""
+
+    class NodeRule(Rule):
+        name = "node"
+        node_types = (ast.arg, ast.Name, ast.AnnAssign, ast.Assign)
+
+        def check(self, node: ast.AST, context: RuleContext) -> None:
+            label = getattr(node, "arg", getattr(node, "id", ""))
+            scope = ".".join(context.scope)
+            context.report(f"{type(node).__name__}:{label} in {scope}")
+
+    registry = RuleRegistry(entry_point_group="type_hint_checker.tests")
+    registry.register(NodeRule)
+    engine = RuleEngine(registry.get_rules())
+    context = RuleContext()
+    for class_ in FileParser(NESTED_SCOPES).classes:
+        engine.run(class_, context)
+    assert context.errors == [
+        "AnnAssign: in Outer",
+        "Name:limit in Outer",
+        "Name:int in Outer",
+        "arg:self in Outer.Inner",
+        "arg:value in Outer.Inner",
+        "Name:value in Outer.Inner.method",
+        "arg:self in Outer",
+        "arg:value in Outer",
+        "Name:int in Outer",
+        "Assign: in Outer.method",
+        "Name:result in Outer.method",
+        "Name:value in Outer.method",
+        "arg:item in Outer.method",
+        "Name:item in Outer.method.helper",
+        "Name:helper in Outer.method",
+        "Name:result in Outer.method",
+        "Name:int in Outer",
+    ]
+    assert context.scope == []
+    assert check_type_hints([NESTED_SCOPES], exclude_parameters="^self$")
+
+
+def test_checkers_write_into_sink() -> None:
+    """Test if the checkers are shared and write the results of many files into
+    a single sink"""
+    function_checker, class_checker = get_checkers("^self$")
+    assert get_checkers("^self$")[1] is class_checker
+    sink = ResultSink()
+    for filename in [NO_RETURN, MIXED_ARGS_CLASS, PROPERLY_ANNOTATED_CLASS]:
+        file = FileParser(filename)
+        context = function_checker.create_context(sink)
+        for function in file.functions:
+            function_checker.check(function, context)
+        for class_ in file.classes:
+            class_checker.check(class_, context)
+    assert sink.errors == [
+        "Missing return type hint for function f1, line 1",
+        "Missing type hint for parameter a (function f1), line 4",
+        "Missing return type hint for function f1, line 4",
+    ]
+    sink.clear()
+    assert sink.errors == [] and sink.functions == []
+
+
+def test_checkers_memory_per_function() -> None:
+    """Test if checking annotated functions keeps no memory per function, and
+    collecting their coverage keeps only the coverage"""
+    source = "".join(
+        f"def f{number}(a: int, b: int = 1, *args: int) -> int:\n    return a\n"
+        for number in range(1000)
+    )
+    file = FileParser("generated.py", source=source)
+    for enabled_rules, max_blocks in [((), 0), ((CoverageRule.name,), 2)]:
+        function_checker, _ = get_checkers("^self$", enabled_rules)
+        warm_up = function_checker.create_context(ResultSink())
+        function_checker.check(file.functions[0], warm_up)
+        tracemalloc.start()
+        sink = ResultSink()
+        context = function_checker.create_context(sink)
+        for function in file.functions:
+            function_checker.check(function, context)
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        blocks = sum(statistic.count for statistic in snapshot.statistics("filename"))
+        assert sink.errors == []
+        assert blocks <= max_blocks * len(file.functions) + 100
+        if not max_blocks:
+            assert peak < 32 * 1024
+
+
+@pytest.mark.parametrize(
+    "target_version, errors",
+    [
+        (
+            "3.8",
+            [
+                "Union operator in type hint of parameter a requires python 3.10 "
+                "(function f1), line 4",
+                "Builtin generic list[...] in type hint of parameter b requires "
+                "python 3.9 (function f1), line 4",
+                "Builtin generic dict[...] in type hint of parameter b requires "
+                "python 3.9 (function f1), line 4",
+                "Builtin generic tuple[...] in return type hint requires python 3.9 "
+                "(function f1), line 4",
+                "Builtin generic list[...] in type hint of parameter a requires "
+                "python 3.9 (function f2), line 9",
+            ],
+        ),
+        (
+            "3.9",
+            [
+                "Union operator in type hint of parameter a requires python 3.10 "
+                "(function f1), line 4",
+            ],
+        ),
+        ("3.10", []),
+        ("", []),
+    ],
+)
+def test_target_version(target_version: str, errors: List[str], caplog) -> None:
+    """Test reporting type hints not supported by the targeted python version"""
+    with caplog.at_level(logging.INFO):
+        result = check_type_hints(
+            [NEW_STYLE_TYPE_HINTS], options=CheckOptions(target_version=target_version)
+        )
+    assert result == (not errors)
+    assert caplog.messages == [f"{NEW_STYLE_TYPE_HINTS}: {error}" for error in errors]
+
+
+@pytest.mark.parametrize(
+    "source, result",
+    [
+        ("if (n := 1):\n    pass\n", True),
+        ("def f(a, /, b):\n    pass\n", True),
+        ("f = lambda a, /: a\n", True),
+        ("def f(a, *, b):\n    pass\n", False),
+    ],
+)
+def test_uses_unsupported_syntax(source: str, result: bool) -> None:
+    """Test detecting the syntax that ast.parse does not reject on older pythons"""
+    tree = ast.parse(source)
+    assert uses_unsupported_syntax(tree, (3, 7)) == result
+    assert uses_unsupported_syntax(tree, (3, 8)) == False
+
+
+def test_target_version_grammar_and_future_import(tmp_path, caplog) -> None:
+    """Test if the file is parsed with the grammar of the targeted version, and if
+    postponed evaluation of the type hints allows the new syntax"""
+    with caplog.at_level(logging.INFO):
+        assert (
+            check_type_hints(
+                [NEW_STYLE_TYPE_HINTS], options=CheckOptions(target_version="3.7")
+            )
+            == False
+        )
+    assert "File could not be parsed as python 3.7" in caplog.text
+    file = tmp_path / "postponed.py"
+    file.write_text(
+        '"""Docstring"""\nfrom __future__ import annotations\n\n\n'
+        "def f(a: int | None) -> list[int]:\n    return []\n"
+    )
+    assert (
+        check_type_hints([str(file)], options=CheckOptions(target_version="3.7"))
+        == True
+    )
+    file.write_text("def f(a: int, /) -> int:\n    return a\n")
+    assert (
+        check_type_hints([str(file)], options=CheckOptions(target_version="3.8"))
+        == True
+    )
+    assert (
+        check_type_hints([str(file)], options=CheckOptions(target_version="3.7"))
+        == False
+    )
+    with raises(ValueError):
+        check_type_hints([str(file)], options=CheckOptions(target_version="2.7"))
+
+
+def test_fix_return_hints(tmp_path: pathlib.Path) -> None:
+    """Test if -> None is inserted only where no value is returned"""
+    file = tmp_path / "fixable.py"
+    file.write_text(
+        "def f(a: int,\n      b: int):  # comment\n    print(a)\n\n\n"
+        "def g():\n    return 1\n\n\n"
+        "class A:\n    def __init__(self):\n        pass\n",
+        encoding="utf-8",
+    )
+    assert ReturnHintFixer().fix_files([str(file)]) == 2
+    assert file.read_text(encoding="utf-8") == (
+        "def f(a: int,\n      b: int) -> None:  # comment\n    print(a)\n\n\n"
+        "def g():\n    return 1\n\n\n"
+        "class A:\n    def __init__(self) -> None:\n        pass\n"
+    )
+    assert [path.name for path in tmp_path.iterdir()] == ["fixable.py"]
+
+
+def test_fix_return_hints_skips_stubs(tmp_path: pathlib.Path) -> None:
+    """Test if stubs, overloads, abstract methods and broken files are not fixed"""
+    source = (
+        "from typing import Protocol, overload\n\n\n"
+        "class P(Protocol):\n    def f(self, a: int):\n        ...\n\n"
+        '    def g(self, a: int):\n        """Docstring"""\n        ...\n\n\n'
+        "@overload\ndef h(a: int):\n    pass\n\n\n"
+        "class A:\n    @abc.abstractmethod\n    def i(self):\n        pass\n"
+    )
+    file = tmp_path / "stubs.py"
+    file.write_text(source, encoding="utf-8")
+    broken = tmp_path / "broken.py"
+    broken.write_text("def f(:\n    pass\n", encoding="utf-8")
+    assert ReturnHintFixer().fix_files([str(broken), str(file)]) == 0
+    assert file.read_text(encoding="utf-8") == source
+    assert broken.read_text(encoding="utf-8") == "def f(:\n    pass\n"
+
+
+@pytest.mark.parametrize(
+    "input_path,check_string_annotations,result",
+    [
+        (STRING_TYPE_HINT, True, True),
+        (MALFORMED_STRING_TYPE_HINT, False, True),
+        (MALFORMED_STRING_TYPE_HINT, True, False),
+    ],
+)
+def test_check_string_annotations(
+    input_path: str, check_string_annotations: bool, result: bool
+) -> None:
+    assert (
+        check_type_hints(
+            [input_path],
+            options=CheckOptions(check_string_annotations=check_string_annotations),
+        )
+        == result
+    )
+
+
+def test_string_annotations_in_log(caplog) -> None:
+    """Test if only the malformed string type hints are reported"""
+    with caplog.at_level(logging.INFO):
+        check_type_hints(
+            [MALFORMED_STRING_TYPE_HINT],
+            options=CheckOptions(check_string_annotations=True),
+        )
+    assert "'List[int'" in caplog.text
+    assert "'garbage )'" in caplog.text
+    assert "'str'" not in caplog.text
+    assert "'not a type'" not in caplog.text
+
+
+def test_use_stubs(tmp_path: pathlib.Path) -> None:
+    """Test if type hints declared in a stub file are treated as present"""
+    module = tmp_path / "stubbed_module.py"
+    module.write_text(
+        "def f1(a, b):\n    return a + b\n\n\n"
+        "class Aaaa:\n    def f2(self, c):\n        return c\n",
+        encoding="utf-8",
+    )
+    assert (
+        check_type_hints([str(module)], options=CheckOptions(use_stubs=True)) == False
+    )
+    (tmp_path / "stubbed_module.pyi").write_text(
+        "import sys\n\ndef f1(a: int, b: int) -> int: ...\n\n"
+        "class Aaaa:\n    if sys.version_info >= (3, 8):\n"
+        "        def f2(self, c: str) -> str: ...\n",
+        encoding="utf-8",
+    )
+    assert check_type_hints([str(module)], options=CheckOptions(use_stubs=True)) == True
+    assert check_type_hints([str(module)]) == False
+
+
+def test_use_stubs_malformed_stub(tmp_path: pathlib.Path, caplog) -> None:
+    """Test if a stub that cannot be parsed is reported without aborting the run"""
+    module = tmp_path / "broken_stub.py"
+    module.write_text("def f(a: int) -> int:\n    return a\n", encoding="utf-8")
+    (tmp_path / "broken_stub.pyi").write_text("def f(:\n", encoding="utf-8")
+    other = tmp_path / "other.py"
+    other.write_text("def g(a):\n    return a\n", encoding="utf-8")
+    with caplog.at_level(logging.INFO):
+        assert (
+            check_type_hints(
+                [str(module), str(other)], options=CheckOptions(use_stubs=True)
+            )
+            == False
+        )
+    assert "File could not be parsed" in caplog.text
+    assert "broken_stub.pyi" in caplog.text
+    assert "other.py" in caplog.text
+
+
+def test_hierarchical_config(tmp_path: pathlib.Path) -> None:
+    """Test if the nearest configuration file up to the project root overrides the
+    options that were not set explicitly"""
+    source = "def f1(test_a, b: int) -> None:\n    pass\n"
+    (tmp_path / "module.py").write_text(source, encoding="utf-8")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "module.py").write_text(source, encoding="utf-8")
+    (tmp_path / "sub" / "deeper").mkdir()
+    (tmp_path / "sub" / "deeper" / "module.py").write_text(source, encoding="utf-8")
+    (tmp_path / "setup.cfg").write_text(
+        "[tool:type_hint_checker]\nexclude_parameters = ^test_\n", encoding="utf-8"
+    )
+    (tmp_path / "sub" / "setup.cfg").write_text(
+        "[tool:type_hint_checker]\nexclude-by-name = ^g\n", encoding="utf-8"
+    )
+    (tmp_path / "sub" / "deeper" / "pyproject.toml").write_text(
+        '[tool.type_hint_checker]\nexclude-by-name = "^h"\n', encoding="utf-8"
+    )
+    resolver = ConfigResolver()
+    settings = resolver.get_settings(str(tmp_path / "sub" / "module.py"))
+    assert settings == Settings(exclude_parameters="^test_", exclude_by_name="^g")
+    assert resolver.get_settings(str(tmp_path / "sub" / "other.py")) is settings
+    deeper = resolver.get_settings(str(tmp_path / "sub" / "deeper" / "module.py"))
+    assert deeper == Settings(exclude_by_name="^h")
+    resolver = ConfigResolver(
+        Settings(exclude_by_name="^f"), explicit=frozenset({"exclude_by_name"})
+    )
+    settings = resolver.get_settings(str(tmp_path / "sub" / "module.py"))
+    assert settings == Settings(exclude_parameters="^test_", exclude_by_name="^f")
+    assert (
+        check_type_hints(
+            [str(tmp_path / "module.py")], options=CheckOptions(use_config=True)
+        )
+        == True
+    )
+    assert check_type_hints([str(tmp_path / "module.py")]) == False
+    assert check_type_hints(
+        [str(tmp_path / "sub" / "module.py")], options=CheckOptions(use_config=True)
+    )
+    assert not check_type_hints(
+        [str(tmp_path / "sub" / "deeper" / "module.py")],
+        options=CheckOptions(use_config=True),
+    )
+
+
+def test_monorepo_config(tmp_path: pathlib.Path) -> None:
+    """Test if a subproject whose pyproject.toml does not configure the checker
+    inherits the settings of the monorepo, while the search stops at .git"""
+    (tmp_path / ".git").mkdir()
+    (tmp_path / "pyproject.toml").write_text(
+        '[tool.type_hint_checker]\nexclude_parameters = "^x$"\n', encoding="utf-8"
+    )
+    (tmp_path / "pkgs" / "foo" / "src").mkdir(parents=True)
+    (tmp_path / "pkgs" / "foo" / "pyproject.toml").write_text(
+        '[project]\nname = "foo"\n', encoding="utf-8"
+    )
+    module = tmp_path / "pkgs" / "foo" / "src" / "a.py"
+    module.write_text("def f1(x) -> None:\n    pass\n", encoding="utf-8")
+    resolver = ConfigResolver()
+    assert resolver.get_settings(str(module)) == Settings(exclude_parameters="^x$")
+    assert check_type_hints([str(module)], options=CheckOptions(use_config=True))
+    (tmp_path / "repo").mkdir()
+    (tmp_path / "repo" / ".git").mkdir()
+    assert resolver.get_settings(str(tmp_path / "repo" / "a.py")) == Settings()
+
+
+def test_incorrect_config(tmp_path: pathlib.Path) -> None:
+    """Test if unknown options in the configuration file raise the correct error"""
+    (tmp_path / "setup.cfg").write_text(
+        "[tool:type_hint_checker]\nexclude_everything = true\n", encoding="utf-8"
+    )
+    with raises(IncorrectConfigException) as exception:
+        ConfigResolver().get_settings(str(tmp_path / "module.py"))
+    assert "exclude_everything" in str(exception)
+    (tmp_path / "setup.cfg").write_text(
+        "[tool:type_hint_checker]\ntarget-version = 3\n", encoding="utf-8"
+    )
+    with raises(IncorrectConfigException) as exception:
+        ConfigResolver().get_settings(str(tmp_path / "module.py"))
+    assert "target-version" in str(exception)
+
+
+def test_coverage_report(tmp_path: pathlib.Path) -> None:
+    """Test counting annotated parameters and returns and merging the reports"""
+    report = CoverageReport()
+    check_type_hints(
+        [MIXED_ARGS_CLASS, NO_RETURN], options=CheckOptions(coverage_report=report)
+    )
+    assert report.files[MIXED_ARGS_CLASS]["functions"] == [
+        {
+            "name": "Aaaa.f1",
+            "line": 4,
+            "parameters": 2,
+            "annotated_parameters": 1,
+            "has_return": False,
+        }
+    ]
+    assert report.aggregate("directory")["tests/cases"] == {
+        "parameters": 3,
+        "annotated_parameters": 2,
+        "returns": 2,
+        "annotated_returns": 0,
+    }
+    path = str(tmp_path / "coverage.json")
+    report.save(path)
+    shard = CoverageReport()
+    check_type_hints(
+        [PROPERLY_ANNOTATED_CLASS, NO_RETURN],
+        options=CheckOptions(coverage_report=shard),
+    )
+    merged = CoverageReport.load(path)
+    merged.merge(shard)
+    assert merged.total() == {
+        "parameters": 4,
+        "annotated_parameters": 3,
+        "returns": 3,
+        "annotated_returns": 1,
+    }
+    assert merged.format_table()[-1].startswith("TOTAL")
+
+
+def test_annotation_index(tmp_path: pathlib.Path) -> None:
+    """Test if the index is updated only for changed files and functions"""
+    module = tmp_path / "module.py"
+    module.write_text(
+        "def f1(a, b: int):\n    pass\n\n\ndef f2() -> None:\n    pass\n",
+        encoding="utf-8",
+    )
+    database = str(tmp_path / "index.db")
+    annotation_index = AnnotationIndex(database)
+    check_type_hints(
+        [str(module), NO_ARGS], options=CheckOptions(annotation_index=annotation_index)
+    )
+    annotation_index.close()
+    annotation_index = AnnotationIndex(database)
+    fingerprint = repr((Settings(), False, ""))
+    sources = {"": module.read_text(encoding="utf-8")}
+    assert not annotation_index.update(str(module), [], sources, fingerprint)
+    annotation_index.close()
+    connection = sqlite3.connect(database)
+    rows = connection.execute(
+        "SELECT qualified_name, lineno, end_lineno, missing_parameters, has_return "
+        "FROM functions WHERE path = ? ORDER BY lineno",
+        (str(module),),
+    ).fetchall()
+    assert rows == [("f1", 1, 2, "a", 0), ("f2", 5, 6, "", 1)]
+    connection.execute("UPDATE functions SET changed_at = '2000-01-01 00:00:00'")
+    connection.commit()
+    module.write_text(
+        "def f0():\n    pass\n\n\ndef f1(a, b: int):\n    pass\n", encoding="utf-8"
+    )
+    annotation_index = AnnotationIndex(database)
+    check_type_hints(
+        [str(module)], options=CheckOptions(annotation_index=annotation_index)
+    )
+    annotation_index.close()
+    rows = connection.execute(
+        "SELECT qualified_name, lineno, changed_at > '2000-01-01 00:00:00' "
+        "FROM functions WHERE path = ? ORDER BY lineno",
+        (str(module),),
+    ).fetchall()
+    assert rows == [("f0", 1, 1), ("f1", 5, 0)]
+    annotation_index = AnnotationIndex(database)
+    check_type_hints(
+        [str(module)],
+        exclude_parameters="^a$",
+        options=CheckOptions(annotation_index=annotation_index),
+    )
+    annotation_index.close()
+    rows = connection.execute(
+        "SELECT qualified_name, missing_parameters FROM functions WHERE path = ? "
+        "ORDER BY lineno",
+        (str(module),),
+    ).fetchall()
+    assert rows == [("f0", ""), ("f1", "")]
+    connection.close()
+
+
+def test_annotation_index_stub_change(tmp_path: pathlib.Path) -> None:
+    """Test if a file is indexed again when only its stub changed"""
+    module = tmp_path / "module.py"
+    module.write_text("def f1(a):\n    pass\n", encoding="utf-8")
+    stub = tmp_path / "module.pyi"
+    database = str(tmp_path / "index.db")
+    connection = sqlite3.connect(database)
+    for stub_source, missing in [
+        ("def f1(a) -> None: ...\n", "a"),
+        ("def f1(a: int) -> None: ...\n", ""),
+    ]:
+        stub.write_text(stub_source, encoding="utf-8")
+        annotation_index = AnnotationIndex(database)
+        check_type_hints(
+            [str(module)],
+            options=CheckOptions(use_stubs=True, annotation_index=annotation_index),
+        )
+        annotation_index.close()
+        rows = connection.execute(
+            "SELECT qualified_name, missing_parameters FROM functions"
+        ).fetchall()
+        assert rows == [("f1", missing)]
+    connection.close()
+
+
+def test_annotation_index_notebook(tmp_path: pathlib.Path) -> None:
+    """Test if the functions of a notebook are hashed from the source of their cell"""
+    notebook = tmp_path / "notebook.ipynb"
+    shutil.copy(NOTEBOOK, notebook)
+    database = str(tmp_path / "index.db")
+    annotation_index = AnnotationIndex(database)
+    check_type_hints(
+        [str(notebook)], options=CheckOptions(annotation_index=annotation_index)
+    )
+    annotation_index.close()
+    connection = sqlite3.connect(database)
+    rows = connection.execute(
+        "SELECT qualified_name, lineno, end_lineno, content_hash FROM functions"
+    ).fetchall()
+    connection.close()
+    assert rows
+    sources = {
+        get_cell_name(cell.number): cell.source.splitlines(keepends=True)
+        for cell in read_code_cells(str(notebook))
+    }
+    for name, lineno, end_lineno, content_hash in rows:
+        lines = sources[name.split(".", 1)[0] + "."][lineno - 1 : end_lineno]
+        assert content_hash == hashlib.sha1("".join(lines).encode()).hexdigest()
+
+
+def test_sample_is_reproducible() -> None:
+    """Test if the same seed gives the same stratified sample"""
+    files = [
+        MIXED_ARGS,
+        NO_RETURN,
+        NO_ARGS,
+        NOT_A_FUNCTION,
+        EMPTY_CLASS,
+        NO_RETURN_CLASS,
+    ]
+    sample = Sample(files, 0.5, seed=3, strata=3)
+    assert len(sample.files) == 3
+    assert sample.population_size == 6
+    assert sample.files == Sample(list(reversed(files)), 3, seed=3, strata=3).files
+
+
+def test_sample_estimates() -> None:
+    """Test if sampling all files gives exact estimates"""
+    files = [MIXED_ARGS, NO_RETURN, NO_ARGS, PROPERLY_ANNOTATED_CLASS]
+    sample = Sample(files, 1.0, strata=2)
+    report = CoverageReport()
+    check_type_hints(sample.files, options=CheckOptions(coverage_report=report))
+    estimates = sample.estimate(report)
+    assert estimates["Files with missing type hints"] == (0.5, 0.5, 0.5)
+    assert estimates["Returns with type hints"] == (0.5, 0.5, 0.5)
+    total = report.total()
+    parameters = total["annotated_parameters"] / total["parameters"]
+    assert estimates["Parameters with type hints"] == (
+        parameters,
+        parameters,
+        parameters,
+    )
+
+
+def test_sample_estimates_undefined_interval(caplog) -> None:
+    """Test if a stratum with a single sampled file gives an undefined interval"""
+    files = [MIXED_ARGS, NO_RETURN, NO_ARGS, PROPERLY_ANNOTATED_CLASS]
+    sample = Sample(files, 2, strata=2)
+    assert [len(stratum.sample) for stratum in sample.strata] == [1, 1]
+    report = CoverageReport()
+    check_type_hints(sample.files, options=CheckOptions(coverage_report=report))
+    estimate = sample.estimate(report)["Files with missing type hints"]
+    assert estimate.value in (0.0, 0.5, 1.0)
+    assert math.isnan(estimate.lower) and math.isnan(estimate.upper)
+    with caplog.at_level(logging.INFO):
+        log_estimates(sample, report, seed=0)
+    assert "confidence interval undefined" in caplog.text
+
+
+@pytest.mark.parametrize(
+    "filename, owners",
+    [
+        ("setup.py", ("@all",)),
+        ("src/app/module.py", ("@app",)),
+        ("tests/app/test_module.py", ("@qa",)),
+        ("docs/conf.py", ("@docs",)),
+        ("docs/api/conf.py", ("@all",)),
+        ("src/legacy/old.py", ()),
+        ("src/app/models_test.py", ("@qa",)),
+    ],
+)
+def test_code_owners(tmp_path: pathlib.Path, filename: str, owners: tuple) -> None:
+    """Test if the last matching CODEOWNERS pattern determines the owners"""
+    (tmp_path / ".github").mkdir()
+    (tmp_path / ".github" / "CODEOWNERS").write_text(
+        "# owners\n*  @all\n/src/app/ @app\n/docs/* @docs\n"
+        "*_test.py @qa\ntests/ @qa\nsrc/legacy\n",
+        encoding="utf-8",
+    )
+    code_owners = CodeOwners(str(tmp_path / ".github" / "CODEOWNERS"))
+    assert code_owners.get_owners(str(tmp_path / filename)) == owners
+
+
+def test_violation_summary(tmp_path: pathlib.Path, caplog) -> None:
+    """Test counting the errors and limiting the logged messages"""
+    (tmp_path / "CODEOWNERS").write_text(
+        "* @all\n*_class.py @classes\n", encoding="utf-8"
+    )
+    summary = ViolationSummary(CodeOwners(str(tmp_path / "CODEOWNERS")))
+    files = [MIXED_ARGS, NO_RETURN, NO_ARGS, MIXED_ARGS_CLASS, COMMENT_ABOVE]
+    with caplog.at_level(logging.INFO):
+        check_type_hints(files, options=CheckOptions(summary=summary, max_messages=2))
+    assert caplog.messages == [
+        f"{MIXED_ARGS}: Missing type hint for parameter a (function f1), line 1",
+        f"{MIXED_ARGS}: Missing return type hint for function f1, line 1",
+        "6 more type hint errors were not shown",
+    ]
+    assert summary.errors == 8
+    assert summary.by_owner == {"@all": 6, "@classes": 2}
+    assert summary.format_lines(top=2) == [
+        "Type hint errors: 8 in 4 of 5 checked files",
+        "Top directories:",
+        "       8  tests/cases",
+        "Top files:",
+        "       3  tests/cases/comment_above.py",
+        "       2  tests/cases/mixed_parameters.py",
+        "Top owners:",
+        "       6  @all",
+        "       2  @classes",
+    ]
@@ -0,0 +1,5 @@
+import sys
+
+from type_hint_checker.main import main
+
+sys.exit(main())
@@ -1,47 +1,108 @@
 import ast
-import re
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from logging import Logger
-from typing import List, Optional, Union
+from typing import Mapping, Optional, Sequence, Tuple, Union
+
+from type_hint_checker.rules import ResultSink, RuleContext, RuleEngine, registry
+from type_hint_checker.stubs import StubSignature
+from type_hint_checker.versions import VersionPolicy
+
+CHECKER_CACHE_SIZE = 64
 
 
 class Checker(ABC):
-    """Checks if an object is chas type hints.
+    """Checks if an object is chas type hints. A checker keeps no results, they are
+    written into the sink of the context supplied by the caller, so a single checker
+    can be reused for all the files checked with the same options.
     Parameters
     ----------
         exclude_parameters (str): regex specifying which parameters should not be
                                 checked
         exclude_by_name: str - Regex specifying names of functions, methods and classes
                                 that should not be checked
+        enabled_rules: Sequence[str] - names of the rules that are not enabled by
+                                default, but should be run
     """
 
     def __init__(
         self,
         exclude_parameters: str = "^self$",
         exclude_by_name: str = "",
+        enabled_rules: Sequence[str] = (),
     ) -> None:
-        self._errors = []
         self._exclude_parameters = exclude_parameters
         self._exclude_by_name = exclude_by_name
+        self._engine = RuleEngine(registry.get_rules(enabled=enabled_rules))
+
+    def create_context(
+        self,
+        sink: ResultSink,
+        stub_signatures: Optional[Mapping[str, StubSignature]] = None,
+        version_policy: Optional[VersionPolicy] = None,
+    ) -> RuleContext:
+        """
+        Creates the context the items of a single file are checked in.
+        Parameters
+        ----------
+            sink (ResultSink): sink the results are written to
+            stub_signatures (Optional[Mapping[str, StubSignature]]): signatures from
+                                the stub of the checked file, treated as type hints
+            version_policy (Optional[VersionPolicy]): type hint features supported
+                                by the targeted python version
+        Returns
+        -------
+            RuleContext
+        """
+        return RuleContext(
+            exclude_parameters=self._exclude_parameters,
+            sink=sink,
+            stub_signatures=stub_signatures,
+            version_policy=version_policy,
+        )
 
     @abstractmethod
-    def check(self, item: Union[ast.FunctionDef, ast.ClassDef]) -> bool:
+    def check(
+        self, item: Union[ast.FunctionDef, ast.ClassDef], context: RuleContext
+    ) -> bool:
         """
         Returns True if a given function/method has type hints.
         Parameters
         ----------
             item (Union[ast.FunctionDef, ast.ClassDef]): the object to be checked
+            context (RuleContext): context of the checked file, see `create_context`
         Returns
         -------
             Bool
         """
 
-    def log_results(self, logger: Logger, filename: Optional[str] = None) -> None:
+    def _run_rules(
+        self, item: Union[ast.FunctionDef, ast.ClassDef], context: RuleContext
+    ) -> bool:
         """
-        Displays a log message for each function or method with type hints.
+        Runs all registered rules on the item in a single traversal.
+        Parameters
+        ----------
+            item (Union[ast.FunctionDef, ast.ClassDef]): the object to be checked
+            context (RuleContext): context of the checked file
+        Returns
+        -------
+            bool - True if the rules did not report any errors
+        """
+        errors_before = len(context.sink.errors)
+        self._engine.run(item, context)
+        return len(context.sink.errors) == errors_before
+
+    @staticmethod
+    def log_results(
+        logger: Logger, sink: ResultSink, filename: Optional[str] = None
+    ) -> None:
+        """
+        Displays a log message for each error in the sink.
         Parameters
         ----------
             logger (Logger): logger object that displays the message.
+            sink (ResultSink): sink the results were written to
             filename (Optional[str]): If provided, the filename will be
                         prepended to the log message
         Returns
@@ -51,15 +112,9 @@ class Checker(ABC):
         prefix = ""
         if filename:
             prefix = f"{filename}: "
-        for error in self._errors:
+        for error in sink.errors:
             logger.info(f"{prefix}{error}")
 
-    def get_errors(self) -> List[str]:
-        """
-        Returns list of string describing the errors detected.
-        """
-        return self._errors
-
 
 class FunctionChecker(Checker):
     """Checks if a function is has type hints.
@@ -69,114 +124,100 @@ class FunctionChecker(Checker):
                                 checked
         exclude_by_name: str - Regex specifying names of functions, methods and classes
                                 that should not be checked
+        enabled_rules: Sequence[str] - names of the rules that are not enabled by
+                                default, but should be run
     """
 
     def __init__(
         self,
         exclude_parameters: str = "",
         exclude_by_name: str = "",
+        enabled_rules: Sequence[str] = (),
     ) -> None:
         super().__init__(
             exclude_parameters=exclude_parameters,
             exclude_by_name=exclude_by_name,
+            enabled_rules=enabled_rules,
         )
 
-    def check(self, item: ast.FunctionDef) -> bool:
+    def check(self, item: ast.FunctionDef, context: RuleContext) -> bool:
         """
         Checks that the function has type hints (parameters and return type).
         Parameters
         ----------
             item (ast.FunctionDef): the function to be checked
+            context (RuleContext): context of the checked file
         Returns
         -------
         bool
             True if type hints are present
         """
-        self.__check_parameters(item)
-        self.__check_return(item)
-        return not bool(self._errors)
-
-    def __check_parameters(self, function: ast.FunctionDef) -> None:
-        """Check that the parameters of a function has type hints.
-        Parameters
-        ----------
-            function (ast.FunctionDef): the function to be checked
-        """
-        parameters = function.args.args
-        for parameter in parameters:
-            if not parameter.annotation:
-                if self.__check_if_param_should_be_checked(parameter.arg):
-                    self._errors.append(
-                        f"Missing type hint for parameter {parameter.arg} "
-                        f"(function {function.name}), line {function.lineno}"
-                    )
-
-    def __check_if_param_should_be_checked(self, parameter: str) -> bool:
-        """Returns True if the parameter should be checked.
-        Parameters
-        ----------
-            parameter (str): - the parameters' name
-        Returns
-        ---------
-            bool
-        """
-        return not self._exclude_parameters or not re.search(
-            self._exclude_parameters, parameter
-        )
-
-    def __check_return(self, function: ast.FunctionDef) -> None:
-        """Check that the function return type is provided.
-        Parameters
-        ----------
-            function (ast.FunctionDef): string containing the source of the function to
-                                        be checked
-        """
-        if not function.returns:
-            self._errors.append(
-                f"Missing return type hint for function {function.name}, "
-                f"line {function.lineno}"
-            )
+        return self._run_rules(item, context)
 
 
 class ClassChecker(Checker):
     """
-    Checks if all methods in a given class has type hints.
+    Checks if all methods in a given class has type hints. The methods are checked
+    in the same traversal as the class.
     Parameters
     ----------
         exclude_parameters (str): regex specifying which parameters should not be
                                 checked
         exclude_by_name: str - Regex specifying names of functions, methods and classes
                                 that should not be checked
+        enabled_rules: Sequence[str] - names of the rules that are not enabled by
+                                default, but should be run
     """
 
     def __init__(
         self,
-        exclude_parameters: List[str] = (),
+        exclude_parameters: str = "",
         exclude_by_name: str = "",
+        enabled_rules: Sequence[str] = (),
     ) -> None:
         super().__init__(
             exclude_parameters=exclude_parameters,
             exclude_by_name=exclude_by_name,
+            enabled_rules=enabled_rules,
         )
 
-    def check(self, item: ast.ClassDef) -> bool:
+    def check(self, item: ast.ClassDef, context: RuleContext) -> bool:
         """
         Checks if all methods in a given class has type hints.
         Parameters
         ----------
             item (ast.FunctionDef): the class to be checked
+            context (RuleContext): context of the checked file
         Returns
         -------
         bool
             True if all methods have type hints.
         """
-        result = True
-        for method in item.body:
-            if isinstance(method, ast.FunctionDef):
-                function_checker = FunctionChecker(
-                    exclude_parameters=self._exclude_parameters,
-                    exclude_by_name=self._exclude_by_name,
-                )
-                result = function_checker.check(method) and result
-                self._errors += function_checker.get_errors()
-        return result
+        return self._run_rules(item, context)
+
+
+@lru_cache(maxsize=CHECKER_CACHE_SIZE)
+def get_checkers(
+    exclude_parameters: str, enabled_rules: Tuple[str, ...] = ()
+) -> Tuple[FunctionChecker, ClassChecker]:
+    """
+    Returns the checkers for the options, created once and shared by all the files
+    checked with the same options.
+    Parameters
+    ----------
+        exclude_parameters (str): regex specifying which parameters should not be
+                                checked
+        enabled_rules (Tuple[str, ...]): names of the rules that are not enabled by
+                                default, but should be run
+    Returns
+    -------
+        Tuple[FunctionChecker, ClassChecker]
+    """
+    return (
+        FunctionChecker(
+            exclude_parameters=exclude_parameters, enabled_rules=enabled_rules
+        ),
+        ClassChecker(
+            exclude_parameters=exclude_parameters, enabled_rules=enabled_rules
+        ),
+    )
@@ -0,0 +1,248 @@
+import configparser
+import os
+import re
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, NamedTuple, Optional, Pattern
+
+from type_hint_checker.exceptions import IncorrectConfigException
+from type_hint_checker.versions import parse_target_version
+
+try:
+    import tomllib
+except ImportError:  # python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+PYPROJECT = "pyproject.toml"
+SETUP_CFG = "setup.cfg"
+PYPROJECT_TABLE = "type_hint_checker"
+SETUP_CFG_SECTIONS = ("tool:type_hint_checker",)
+PROJECT_ROOT_MARKERS = (".git",)
+
+
+class Settings(NamedTuple):
+    """
+    Options controlling how the files in a directory are checked.
+    Parameters
+    ----------
+        exclude_parameters : str - regex specifying which parameters should not be
+                                checked
+        exclude_by_name : str - regex specifying names of functions, methods and
+                                classes that should not be checked
+        ignore_comment : str - if this phrase appears in the comment, the item is
+                                excluded
+        check_string_annotations : bool - if True, malformed string type hints are
+                                reported
+        target_version : str - python version the files are parsed with and
+                                whose type hint features they may use, e.g. "3.8",
+                                the running interpreter's if empty
+    """
+
+    exclude_parameters: str = "^self$"
+    exclude_by_name: str = ""
+    ignore_comment: str = "no-check"
+    check_string_annotations: bool = False
+    target_version: str = ""
+
+
+DEFAULT_SETTINGS = Settings()
+
+
+class ConfigResolver:  # pylint: disable=too-few-public-methods
+    """
+    Resolves the settings of each directory from the `[tool.type_hint_checker]`
+    table of `pyproject.toml` or the `[tool:type_hint_checker]` section of
+    `setup.cfg`. The values from the nearest directory override the values from its
+    ancestors, which override the base settings, except for the options set
+    explicitly, e.g. on the command line, which are never overridden. The ancestors
+    are searched up to the root of the project, i.e. the first directory containing
+    `.git` or a `pyproject.toml` with the `[tool.type_hint_checker]` table, so a
+    subproject without the table inherits the settings of its ancestors. Every
+    directory is resolved once and identical settings are shared.
+    Parameters
+    ----------
+        base : Settings - settings used when no configuration file overrides them
+        explicit : FrozenSet[str] - names of the options of the base settings that
+                                take precedence over the configuration files
+    """
+
+    def __init__(
+        self, base: Settings = Settings(), explicit: FrozenSet[str] = frozenset()
+    ) -> None:
+        self.__base = base
+        self.__explicit = explicit
+        self.__directories: Dict[str, Settings] = {}
+        self.__shared: Dict[Settings, Settings] = {base: base}
+
+    def get_settings(self, filename: str) -> Settings:
+        """
+        Returns the settings for a file.
+        Parameters
+        ----------
+            filename (str): path to the checked file
+        Returns
+        -------
+            Settings
+        """
+        return self.__resolve(os.path.dirname(os.path.abspath(filename)))
+
+    def __resolve(self, directory: str) -> Settings:
+        """Returns the settings of a directory, resolving its ancestors first"""
+        settings = self.__directories.get(directory)
+        if settings is None:
+            table = _read_pyproject_table(directory)
+            parent = os.path.dirname(directory)
+            if parent == directory or _is_project_root(directory, table):
+                settings = self.__base
+            else:
+                settings = self.__resolve(parent)
+            overrides = {
+                name: value
+                for name, value in _read_options(directory, table).items()
+                if name not in self.__explicit
+            }
+            if overrides:
+                settings = settings._replace(**overrides)
+                settings = self.__shared.setdefault(settings, settings)
+            self.__directories[directory] = settings
+        return settings
+
+
+def _is_project_root(directory: str, table: Optional[Dict[str, Any]]) -> bool:
+    """
+    Returns True if the directory is the root of a repository or of a project
+    configuring the type_hint_checker in its `pyproject.toml`.
+    Parameters
+    ----------
+        directory (str): the directory
+        table (Optional[Dict[str, Any]]): the type_hint_checker table of the
+                                `pyproject.toml` in the directory, if any
+    Returns
+    -------
+        bool
+    """
+    return table is not None or any(
+        os.path.exists(os.path.join(directory, marker))
+        for marker in PROJECT_ROOT_MARKERS
+    )
+
+
+def read_config(directory: str) -> Dict[str, Any]:
+    """
+    Reads the type_hint_checker options defined directly in a directory. The
+    `pyproject.toml` takes precedence over `setup.cfg`.
+    Parameters
+    ----------
+        directory (str): the directory
+    Returns
+    -------
+        Dict[str, Any] - options by their names, empty if there are none
+    """
+    return _read_options(directory, _read_pyproject_table(directory))
+
+
+def _read_pyproject_table(directory: str) -> Optional[Dict[str, Any]]:
+    """
+    Reads the `[tool.type_hint_checker]` table of the `pyproject.toml` in a
+    directory.
+    Parameters
+    ----------
+        directory (str): the directory
+    Returns
+    -------
+        Optional[Dict[str, Any]] - the table, None if there is no such table
+    """
+    pyproject = os.path.join(directory, PYPROJECT)
+    if tomllib is None or not os.path.isfile(pyproject):
+        return None
+    with open(pyproject, "rb") as file:
+        try:
+            content = tomllib.load(file)
+        except tomllib.TOMLDecodeError as exc:
+            raise IncorrectConfigException(
+                f"File could not be parsed: {pyproject}"
+            ) from exc
+    return content.get("tool", {}).get(PYPROJECT_TABLE)
+
+
+def _read_options(directory: str, table: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Validates the options of the `pyproject.toml` table or, if there is no table,
+    reads the options from the `setup.cfg` in the directory.
+    Parameters
+    ----------
+        directory (str): the directory
+        table (Optional[Dict[str, Any]]): the type_hint_checker table of the
+                                `pyproject.toml` in the directory, if any
+    Returns
+    -------
+        Dict[str, Any] - options by their names, empty if there are none
+    """
+    if table is not None:
+        return _validate(table, os.path.join(directory, PYPROJECT))
+    setup_cfg = os.path.join(directory, SETUP_CFG)
+    if os.path.isfile(setup_cfg):
+        parser = configparser.ConfigParser(interpolation=None)
+        try:
+            parser.read(setup_cfg, encoding="utf-8")
+        except configparser.Error as exc:
+            raise IncorrectConfigException(
+                f"File could not be parsed: {setup_cfg}"
+            ) from exc
+        for section in SETUP_CFG_SECTIONS:
+            if parser.has_section(section):
+                return _validate(dict(parser.items(section)), setup_cfg)
+    return {}
+
+
+def _validate(options: Dict[str, Any], path: str) -> Dict[str, Any]:
+    """
+    Checks the names and types of the options read from a configuration file.
+    Parameters
+    ----------
+        options (Dict[str, Any]): the options as read from the file
+        path (str): path to the file, used in the error message
+    Returns
+    -------
+        Dict[str, Any] - the options with normalized names and values
+    """
+    result = {}
+    for key, value in options.items():
+        name = key.replace("-", "_")
+        if name not in Settings._fields:
+            raise IncorrectConfigException(f"Unknown option {key} in {path}")
+        default = getattr(DEFAULT_SETTINGS, name)
+        if isinstance(default, bool) and isinstance(value, str):
+            if value.lower() not in configparser.ConfigParser.BOOLEAN_STATES:
+                raise IncorrectConfigException(
+                    f"Option {key} in {path} should be a boolean"
+                )
+            value = configparser.ConfigParser.BOOLEAN_STATES[value.lower()]
+        if not isinstance(value, type(default)):
+            raise IncorrectConfigException(f"Option {key} in {path} has incorrect type")
+        if name == "target_version" and value:
+            try:
+                parse_target_version(value)
+            except ValueError as exc:
+                raise IncorrectConfigException(
+                    f"Option {key} in {path} is incorrect: {exc}"
+                ) from exc
+        result[name] = value
+    return result
+
+
+@lru_cache(maxsize=None)
+def compile_pattern(pattern: str) -> Optional[Pattern]:
+    """
+    Compiles a regex once per run, so that the files sharing the settings share the
+    compiled pattern.
+    Parameters
+    ----------
+        pattern (str): the regex, empty if nothing should match
+    Returns
+    -------
+        Optional[Pattern] - the compiled regex or None if the pattern is empty
+    """
+    return re.compile(pattern) if pattern else None
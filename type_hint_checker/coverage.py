@@ -0,0 +1,209 @@
+import json
+import os
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+COUNTERS = ("parameters", "annotated_parameters", "returns", "annotated_returns")
+TOP_LEVEL_PACKAGE = "<top-level>"
+
+
+class FunctionCoverage(NamedTuple):
+    """
+    Type hint coverage of a single function or method.
+    Parameters
+    ----------
+        name : str - qualified name of the function, e.g. `Class.method`
+        lineno : int - first line of the function
+        end_lineno : int - last line of the function
+        parameters : int - number of checked parameters
+        annotated_parameters : int - number of checked parameters with type hints
+        has_return : bool - True if the return type hint is provided
+        missing_parameters : Tuple[str, ...] - names of the checked parameters
+                                without type hints
+    """
+
+    name: str
+    lineno: int
+    end_lineno: int
+    parameters: int
+    annotated_parameters: int
+    has_return: bool
+    missing_parameters: Tuple[str, ...] = ()
+
+
+class CoverageReport:
+    """
+    Type hint coverage of the checked files. The counts are stored per file, so
+    reports of different shards of a repository can be merged, and a stored report
+    can be updated with the results of the files that changed.
+    """
+
+    def __init__(self) -> None:
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.__packages: Dict[str, str] = {}
+
+    def add_file(self, filename: str, functions: Iterable[FunctionCoverage]) -> None:
+        """
+        Records the coverage of a file, replacing the previous record of the file.
+        Parameters
+        ----------
+            filename (str): path to the file
+            functions (Iterable[FunctionCoverage]): coverage of the checked functions
+        """
+        entry: Dict[str, Any] = dict.fromkeys(COUNTERS, 0)
+        entry["package"] = self.__get_package(filename)
+        entry["functions"] = []
+        for function in functions:
+            entry["parameters"] += function.parameters
+            entry["annotated_parameters"] += function.annotated_parameters
+            entry["returns"] += 1
+            entry["annotated_returns"] += function.has_return
+            entry["functions"].append(
+                {
+                    "name": function.name,
+                    "line": function.lineno,
+                    "parameters": function.parameters,
+                    "annotated_parameters": function.annotated_parameters,
+                    "has_return": function.has_return,
+                }
+            )
+        self.files[os.path.normpath(filename)] = entry
+
+    def merge(self, other: "CoverageReport") -> None:
+        """
+        Adds the files of another report, replacing the records of the same files.
+        Parameters
+        ----------
+            other (CoverageReport): the report to be merged into this one
+        """
+        self.files.update(other.files)
+
+    def aggregate(self, level: str) -> Dict[str, Dict[str, int]]:
+        """
+        Sums the counts of the files by module, package or directory. The counts
+        of a directory include all its subdirectories.
+        Parameters
+        ----------
+            level (str): one of "module", "package" and "directory"
+        Returns
+        -------
+            Dict[str, Dict[str, int]] - counts by the module, package or directory
+        """
+        result: Dict[str, Dict[str, int]] = {}
+        for filename, entry in self.files.items():
+            if level == "module":
+                keys = [filename]
+            elif level == "package":
+                keys = [entry["package"] or TOP_LEVEL_PACKAGE]
+            elif level == "directory":
+                keys = _ancestors(filename)
+            else:
+                raise ValueError(f"Unknown coverage level: {level}")
+            for key in keys:
+                counts = result.setdefault(key, dict.fromkeys(COUNTERS, 0))
+                for counter in COUNTERS:
+                    counts[counter] += entry[counter]
+        return result
+
+    def total(self) -> Dict[str, int]:
+        """Returns the counts summed over all files"""
+        return {
+            counter: sum(entry[counter] for entry in self.files.values())
+            for counter in COUNTERS
+        }
+
+    def format_table(self, level: str = "directory") -> List[str]:
+        """
+        Formats the coverage by module, package or directory as lines of a table.
+        Parameters
+        ----------
+            level (str): one of "module", "package" and "directory"
+        Returns
+        -------
+            List[str] - lines of the table, the last one containing the total
+        """
+        rows = sorted(self.aggregate(level).items())
+        rows.append(("TOTAL", self.total()))
+        width = max(len(name) for name, _ in rows)
+        lines = [f"{level:<{width}}  {'parameters':>16}  {'returns':>16}"]
+        for name, counts in rows:
+            parameters = _format_ratio(
+                counts["annotated_parameters"], counts["parameters"]
+            )
+            returns = _format_ratio(counts["annotated_returns"], counts["returns"])
+            lines.append(f"{name:<{width}}  {parameters:>16}  {returns:>16}")
+        return lines
+
+    def to_json(self) -> Dict[str, Any]:
+        """Returns the report, including the aggregates, as a JSON serializable dict"""
+        return {
+            "total": self.total(),
+            "directories": self.aggregate("directory"),
+            "packages": self.aggregate("package"),
+            "files": self.files,
+        }
+
+    def save(self, path: str) -> None:
+        """
+        Writes the report to a JSON file.
+        Parameters
+        ----------
+            path (str): path to the JSON file
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_json(), file, indent=2, sort_keys=True)
+
+    @classmethod
+    def load(cls, path: str) -> "CoverageReport":
+        """
+        Reads a report written by `save`. Returns an empty report if the file does
+        not exist.
+        Parameters
+        ----------
+            path (str): path to the JSON file
+        Returns
+        -------
+            CoverageReport
+        """
+        report = cls()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                report.files = json.load(file)["files"]
+        return report
+
+    def __get_package(self, filename: str) -> str:
+        """
+        Returns the dotted name of the package containing the module, determined by
+        the `__init__.py` files of its directory and the directories above it.
+        """
+        directory = os.path.dirname(os.path.abspath(filename))
+        if directory not in self.__packages:
+            parent = os.path.dirname(directory)
+            if parent != directory and os.path.isfile(
+                os.path.join(directory, "__init__.py")
+            ):
+                name = os.path.basename(directory)
+                parent_package = self.__get_package(directory)
+                self.__packages[directory] = (
+                    f"{parent_package}.{name}" if parent_package else name
+                )
+            else:
+                self.__packages[directory] = ""
+        return self.__packages[directory]
+
+
+def _ancestors(filename: str) -> List[str]:
+    """Returns the directory of the file and all the directories above it"""
+    result = []
+    directory = os.path.dirname(filename)
+    while True:
+        result.append(directory or ".")
+        parent = os.path.dirname(directory)
+        if not directory or parent == directory:
+            return result
+        directory = parent
+
+
+def _format_ratio(annotated: int, total: int) -> str:
+    """Formats the number of annotated items and their percentage"""
+    percentage = 100 * annotated / total if total else 100.0
+    return f"{annotated}/{total} ({percentage:.1f}%)"
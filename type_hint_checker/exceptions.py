@@ -1,2 +1,6 @@
 class IncorrectFileException(Exception):
     """Incorrect file exception"""
+
+
+class IncorrectConfigException(Exception):
+    """Incorrect configuration file exception"""
@@ -1,12 +1,14 @@
 import ast
-import re
-from tokenize import tokenize, COMMENT
-from typing import List
+import io
+from tokenize import generate_tokens, COMMENT
+from typing import List, Optional
 
+from type_hint_checker.config import compile_pattern
 from type_hint_checker.exceptions import IncorrectFileException
+from type_hint_checker.versions import parse_target_version, uses_unsupported_syntax
 
 
-class FileParser:  # pylint: disable=too-few-public-methods
+class FileParser:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
     """
     File with its AST, functions, classes and exclusions by comments
     Parameters
@@ -16,6 +18,10 @@ class FileParser:  # pylint: disable=too-few-public-methods
                                 omitted
         ignore_comment : str - if this phrase appears in the comment, the item is
                                 excluded
+        source : Optional[str] - content of the file, read from the disk if not
+                                provided
+        target_version : str - python version whose grammar the file is parsed
+                                with, e.g. "3.8", the running interpreter's if empty
     """
 
     def __init__(
@@ -23,11 +29,18 @@ class FileParser:  # pylint: disable=too-few-public-methods
         filename: str,
         excluded_names: str = "",
         ignore_comment: str = "no-check",
+        source: Optional[str] = None,
+        target_version: str = "",
     ) -> None:
         self.__ignore_comment = ignore_comment
+        self.__target_version = target_version
         self.__excluded_names = excluded_names
         self.__filename = filename
+        if source is None:
+            source = _read_source(filename)
+        self.source = source
         self.__body = self.__get_body()
+        self.postponed_annotations = self.__has_postponed_annotations()
         self.__excluded_lines = self.__get_excluded_lines()
         self.functions = self.__get_functions()
         self.classes = self.__get_classes()
@@ -37,15 +50,40 @@ class FileParser:  # pylint: disable=too-few-public-methods
         Returns
         -------
             List[ast.AST] - list of ast items from the file"""
-        with open(self.__filename, "r", encoding="utf-8") as file:
-            source = file.read()
+        feature_version = None
+        if self.__target_version:
+            feature_version = parse_target_version(self.__target_version)
         try:
-            body = ast.parse(source).body
-        except SyntaxError as exc:
+            tree = ast.parse(self.source, feature_version=feature_version)
+            if feature_version and uses_unsupported_syntax(tree, feature_version):
+                raise SyntaxError(f"syntax newer than python {self.__target_version}")
+        except (SyntaxError, ValueError, RecursionError, MemoryError) as exc:
+            if self.__target_version:
+                raise IncorrectFileException(
+                    f"File could not be parsed as python {self.__target_version}: "
+                    f"{self.__filename}"
+                ) from exc
             raise IncorrectFileException(
                 f"File could not be parsed: {self.__filename}"
             ) from exc
-        return body
+        return tree.body
+
+    def __has_postponed_annotations(self) -> bool:
+        """Return True if the file starts with `from __future__ import annotations`
+        Returns
+        -------
+            bool - True if the type hints in the file are not evaluated"""
+        for item in self.__body:
+            if isinstance(item, ast.ImportFrom) and item.module == "__future__":
+                if any(alias.name == "annotations" for alias in item.names):
+                    return True
+            elif not (
+                isinstance(item, ast.Expr)
+                and isinstance(item.value, ast.Constant)
+                and isinstance(item.value.value, str)
+            ):
+                return False
+        return False
 
     def __get_functions(self) -> List[ast.FunctionDef]:
         """Return functions defined in the file if not excluded
@@ -82,12 +120,11 @@ class FileParser:  # pylint: disable=too-few-public-methods
 
         """
         result = []
-        with open(self.__filename, "rb") as file:
-            tokenized = tokenize(file.readline)
-            for item in tokenized:
-                if item.exact_type == COMMENT:
-                    if self.__ignore_comment in item.line:
-                        result.append(item.start[0])
+        tokenized = generate_tokens(io.StringIO(self.source).readline)
+        for item in tokenized:
+            if item.exact_type == COMMENT:
+                if self.__ignore_comment in item.line:
+                    result.append(item.start[0])
         return result
 
     def __is_excluded_by_comment(self, item: ast.AST) -> bool:
@@ -115,4 +152,48 @@ class FileParser:  # pylint: disable=too-few-public-methods
         -------
             bool - False if the object should not be checked
         """
-        return self.__excluded_names and re.search(self.__excluded_names, name)
+        pattern = compile_pattern(self.__excluded_names)
+        return bool(pattern and pattern.search(name))
+
+
+def _read_source(filename: str) -> str:
+    """
+    Reads the content of a file, reporting a file that cannot be read or decoded as
+    an incorrect file.
+    Parameters
+    ----------
+        filename : str - path to the file
+    Returns
+    -------
+        str - the content of the file
+    """
+    try:
+        with open(filename, "r", encoding="utf-8", newline="") as file:
+            return file.read()
+    except UnicodeDecodeError as exc:
+        raise IncorrectFileException(f"File could not be decoded: {filename}") from exc
+    except OSError as exc:
+        raise IncorrectFileException(f"File could not be read: {filename}") from exc
+
+
+def get_parameters(arguments: ast.arguments) -> List[ast.arg]:
+    """
+    Returns all parameters of a function signature, including positional only,
+    keyword only and variadic parameters
+    Parameters
+    ----------
+        arguments : ast.arguments - the signature of the function
+    Returns
+    -------
+        List[ast.arg] - the parameters
+    """
+    result = [
+        *getattr(arguments, "posonlyargs", []),
+        *arguments.args,
+        *arguments.kwonlyargs,
+    ]
+    if arguments.vararg:
+        result.append(arguments.vararg)
+    if arguments.kwarg:
+        result.append(arguments.kwarg)
+    return result
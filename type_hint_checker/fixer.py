@@ -0,0 +1,248 @@
+import ast
+import io
+import os
+import shutil
+import tempfile
+from tokenize import generate_tokens, NAME, OP
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from type_hint_checker.config import ConfigResolver
+from type_hint_checker.exceptions import IncorrectFileException
+from type_hint_checker.file_parser import FileParser
+
+NONE_RETURN_HINT = " -> None"
+SKIPPED_DECORATORS = frozenset({"abstractmethod", "overload"})
+
+
+class ReturnHintFixer:
+    """
+    Inserts `-> None` into functions and methods that do not have a return type
+    hint and do not return any value, as well as into `__init__` methods.
+    Only the missing hint is inserted, the rest of the file is left untouched.
+    Parameters
+    ----------
+        excluded_names : str - regex specifying which functions and classes should be
+                                omitted
+        ignore_comment : str - if this phrase appears in the comment, the item is
+                                excluded
+        batch_size : int - number of modified files kept in memory before they are
+                                written to the disk
+        config_resolver : Optional[ConfigResolver] - if provided, the names and the
+                                comment are overridden by the configuration files
+    """
+
+    def __init__(
+        self,
+        excluded_names: str = "",
+        ignore_comment: str = "no-check",
+        batch_size: int = 100,
+        config_resolver: Optional[ConfigResolver] = None,
+    ) -> None:
+        self.__excluded_names = excluded_names
+        self.__ignore_comment = ignore_comment
+        self.__batch_size = batch_size
+        self.__config_resolver = config_resolver
+
+    def fix_files(self, file_list: Iterable[str]) -> int:
+        """
+        Fixes the files in place. The files are written atomically, in batches.
+        Jupyter notebooks are not fixed, neither are the files that cannot be
+        parsed, which are left to be reported by the check.
+        Parameters
+        ----------
+            file_list (Iterable[str]): Filenames to be fixed
+        Returns
+        -------
+            int - number of inserted return type hints
+        """
+        fixed = 0
+        batch: List[Tuple[str, str]] = []
+        excluded_names, ignore_comment = self.__excluded_names, self.__ignore_comment
+        for filename in file_list:
+            if filename.endswith(".ipynb"):
+                continue
+            if self.__config_resolver:
+                settings = self.__config_resolver.get_settings(filename)
+                excluded_names = settings.exclude_by_name
+                ignore_comment = settings.ignore_comment
+            try:
+                file = FileParser(
+                    filename,
+                    excluded_names=excluded_names,
+                    ignore_comment=ignore_comment,
+                )
+            except IncorrectFileException:
+                continue
+            source, count = self.fix_source(file)
+            if count:
+                fixed += count
+                batch.append((filename, source))
+            if len(batch) >= self.__batch_size:
+                self.__write_batch(batch)
+                batch = []
+        self.__write_batch(batch)
+        return fixed
+
+    def fix_source(self, file: FileParser) -> Tuple[str, int]:
+        """
+        Returns the source of the file with the missing `-> None` hints inserted.
+        Parameters
+        ----------
+            file (FileParser): the parsed file
+        Returns
+        -------
+            Tuple[str, int] - the fixed source and the number of inserted hints
+        """
+        lines = {function.lineno for function in self.__fixable_functions(file)}
+        if not lines:
+            return file.source, 0
+        source_lines = io.StringIO(file.source).readlines()
+        insertions = list(self.__find_signature_ends(file.source, lines))
+        for row, column in sorted(insertions, reverse=True):
+            line = source_lines[row - 1]
+            source_lines[row - 1] = line[:column] + NONE_RETURN_HINT + line[column:]
+        return "".join(source_lines), len(insertions)
+
+    def __fixable_functions(self, file: FileParser) -> Iterator[ast.FunctionDef]:
+        """Yields the checked functions and methods whose return hint can be fixed"""
+        for function in file.functions:
+            if self.__returns_none(function):
+                yield function
+        for class_ in file.classes:
+            for method in class_.body:
+                if isinstance(method, ast.FunctionDef) and self.__returns_none(method):
+                    yield method
+
+    @staticmethod
+    def __returns_none(function: ast.FunctionDef) -> bool:
+        """
+        Returns True if the function is missing a return type hint that is
+        certainly None. Overloads, abstract methods and bodies consisting only of
+        `...` (e.g. methods of protocols and stubs) are not fixed, as their body
+        says nothing about the returned type.
+        Parameters
+        ----------
+            function (ast.FunctionDef): the function to be checked
+        Returns
+        -------
+            bool
+        """
+        if function.returns or _is_declaration(function):
+            return False
+        if function.name == "__init__":
+            return True
+        body = function.body
+        if _is_docstring(body[0]):
+            body = body[1:]
+        if not body:
+            return True
+        if len(body) == 1 and (isinstance(body[0], ast.Raise) or _is_ellipsis(body[0])):
+            return False
+        return not _returns_value(body)
+
+    @staticmethod
+    def __find_signature_ends(
+        source: str, lines: Iterable[int]
+    ) -> Iterator[Tuple[int, int]]:
+        """
+        Yields the positions right after the closing parenthesis of the parameters
+        of the functions defined in the given lines.
+        Parameters
+        ----------
+            source (str): the source of the file
+            lines (Iterable[int]): lines containing the `def` keyword
+        Returns
+        -------
+            Iterator[Tuple[int, int]] - (line, column) of the insertion points
+        """
+        pending = set(lines)
+        depth = 0
+        in_signature = False
+        for token in generate_tokens(io.StringIO(source).readline):
+            if not in_signature:
+                if token.type == NAME and token.string == "def":
+                    in_signature = token.start[0] in pending
+                continue
+            if token.type != OP:
+                continue
+            if token.string in ("(", "[", "{"):
+                depth += 1
+            elif token.string in (")", "]", "}"):
+                depth -= 1
+                if depth == 0:
+                    in_signature = False
+                    yield token.end
+
+    @staticmethod
+    def __write_batch(batch: List[Tuple[str, str]]) -> None:
+        """
+        Writes each file to a temporary file in the same directory and atomically
+        replaces the original, keeping its permissions.
+        Parameters
+        ----------
+            batch (List[Tuple[str, str]]): pairs of filenames and their new content
+        """
+        for filename, source in batch:
+            directory = os.path.dirname(os.path.abspath(filename))
+            with tempfile.NamedTemporaryFile(
+                "w",
+                encoding="utf-8",
+                newline="",
+                dir=directory,
+                prefix=".type_hint_checker.",
+                delete=False,
+            ) as temporary:
+                temporary.write(source)
+            try:
+                shutil.copymode(filename, temporary.name)
+                os.replace(temporary.name, filename)
+            except OSError:
+                os.unlink(temporary.name)
+                raise
+
+
+def _is_declaration(function: ast.FunctionDef) -> bool:
+    """Returns True if the function is an overload or an abstract method"""
+    for decorator in function.decorator_list:
+        name = getattr(decorator, "attr", getattr(decorator, "id", None))
+        if name in SKIPPED_DECORATORS:
+            return True
+    return False
+
+
+def _is_docstring(statement: ast.stmt) -> bool:
+    """Returns True if the statement is a string"""
+    return (
+        isinstance(statement, ast.Expr)
+        and isinstance(statement.value, ast.Constant)
+        and isinstance(statement.value.value, str)
+    )
+
+
+def _is_ellipsis(statement: ast.stmt) -> bool:
+    """Returns True if the statement is `...`"""
+    return (
+        isinstance(statement, ast.Expr)
+        and isinstance(statement.value, ast.Constant)
+        and statement.value.value is Ellipsis
+    )
+
+
+def _returns_value(body: List[ast.stmt]) -> bool:
+    """
+    Returns True if the body returns a value other than None or yields, not
+    counting the nested functions and classes.
+    """
+    nodes: List[ast.AST] = list(body)
+    while nodes:
+        node = nodes.pop()
+        if isinstance(node, (ast.Yield, ast.YieldFrom)):
+            return True
+        if isinstance(node, ast.Return) and node.value is not None:
+            if not (isinstance(node.value, ast.Constant) and node.value.value is None):
+                return True
+        if not isinstance(
+            node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)
+        ):
+            nodes.extend(ast.iter_child_nodes(node))
+    return False
@@ -0,0 +1,164 @@
+import hashlib
+import os
+import sqlite3
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+from type_hint_checker.coverage import FunctionCoverage
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    indexed_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS functions (
+    path TEXT NOT NULL,
+    qualified_name TEXT NOT NULL,
+    lineno INTEGER NOT NULL,
+    end_lineno INTEGER NOT NULL,
+    parameters INTEGER NOT NULL,
+    missing_parameters TEXT NOT NULL,
+    has_return INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    changed_at TEXT NOT NULL,
+    PRIMARY KEY (path, qualified_name, lineno)
+);
+CREATE INDEX IF NOT EXISTS functions_changed_at ON functions (changed_at);
+"""
+
+
+class AnnotationIndex:
+    """
+    SQLite database with the type hint status of every checked function, kept up to
+    date between runs. Files whose content and settings did not change since they
+    were indexed are skipped, and the changes are written in batches, one
+    transaction per batch.
+    Parameters
+    ----------
+        path : str - path to the database file, created if it does not exist
+        batch_size : int - number of changed files written in a single transaction
+    """
+
+    def __init__(self, path: str, batch_size: int = 500) -> None:
+        self.__connection = sqlite3.connect(path)
+        self.__connection.executescript(SCHEMA)
+        self.__batch_size = batch_size
+        self.__hashes: Dict[str, str] = dict(
+            self.__connection.execute("SELECT path, content_hash FROM files")
+        )
+        self.__pending: List[Tuple[str, str, List[Tuple[FunctionCoverage, str]]]] = []
+
+    def update(
+        self,
+        filename: str,
+        functions: Iterable[FunctionCoverage],
+        sources: Mapping[str, str],
+        fingerprint: str = "",
+    ) -> bool:
+        """
+        Schedules the functions of a file to be written, unless neither the file nor
+        the settings it was checked with changed since it was indexed.
+        Parameters
+        ----------
+            filename (str): path to the checked file
+            functions (Iterable[FunctionCoverage]): the functions of the file
+            sources (Mapping[str, str]): the checked sources of the file by the
+                                prefix of the qualified names of their functions,
+                                e.g. the code cells of a notebook
+            fingerprint (str): representation of the effective settings the file was
+                                checked with
+        Returns
+        -------
+            bool - True if the file changed and will be written
+        """
+        digest = hashlib.sha1(fingerprint.encode())
+        for prefix, source in sources.items():
+            digest.update(b"\0" + prefix.encode() + b"\0" + source.encode())
+        content_hash = digest.hexdigest()
+        path = os.path.normpath(filename)
+        if self.__hashes.get(path) == content_hash:
+            return False
+        self.__hashes[path] = content_hash
+        lines_by_prefix = {
+            prefix: source.encode().splitlines(keepends=True)
+            for prefix, source in sources.items()
+        }
+        notebook = filename.endswith(".ipynb")
+        hashed_functions = []
+        for function in functions:
+            prefix = function.name.split(".", 1)[0] + "." if notebook else ""
+            lines = lines_by_prefix.get(prefix, [])
+            source = b"".join(lines[function.lineno - 1 : function.end_lineno])
+            hashed_functions.append((function, hashlib.sha1(source).hexdigest()))
+        self.__pending.append((path, content_hash, hashed_functions))
+        if len(self.__pending) >= self.__batch_size:
+            self.flush()
+        return True
+
+    def flush(self) -> None:
+        """Writes the scheduled files in a single transaction"""
+        if not self.__pending:
+            return
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        with self.__connection:
+            for path, content_hash, functions in self.__pending:
+                self.__write_file(path, content_hash, functions, now)
+        self.__pending = []
+
+    def close(self) -> None:
+        """Writes the scheduled files and closes the database"""
+        self.flush()
+        self.__connection.close()
+
+    def __write_file(
+        self,
+        path: str,
+        content_hash: str,
+        functions: List[Tuple[FunctionCoverage, str]],
+        now: str,
+    ) -> None:
+        """
+        Replaces the rows of a file in the current transaction. A function keeps its
+        `first_seen` and `changed_at` dates if a function with the same name and the
+        same source was indexed before, even if it moved to other lines.
+        """
+        cursor = self.__connection.execute(
+            "SELECT qualified_name, content_hash, first_seen, changed_at "
+            "FROM functions WHERE path = ?",
+            (path,),
+        )
+        previous = {
+            (name, function_hash): (first_seen, changed_at)
+            for name, function_hash, first_seen, changed_at in cursor
+        }
+        first_seen_by_name = {name: dates[0] for (name, _), dates in previous.items()}
+        rows = []
+        for function, function_hash in functions:
+            first_seen, changed_at = previous.get(
+                (function.name, function_hash),
+                (first_seen_by_name.get(function.name, now), now),
+            )
+            rows.append(
+                (
+                    path,
+                    function.name,
+                    function.lineno,
+                    function.end_lineno,
+                    function.parameters,
+                    ",".join(function.missing_parameters),
+                    function.has_return,
+                    function_hash,
+                    first_seen,
+                    changed_at,
+                )
+            )
+        self.__connection.execute("DELETE FROM functions WHERE path = ?", (path,))
+        self.__connection.executemany(
+            "INSERT OR REPLACE INTO functions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        self.__connection.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?)", (path, content_hash, now)
+        )
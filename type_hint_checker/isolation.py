@@ -0,0 +1,250 @@
+import multiprocessing
+import os
+import time
+from multiprocessing.connection import Connection, wait
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from type_hint_checker.stubs import StubIndex
+
+try:
+    import resource
+except ImportError:  # windows
+    resource = None
+
+CheckFunction = Callable[[str, Any, Optional[StubIndex]], Any]
+
+
+class ProcessLimits(NamedTuple):
+    """
+    Limits of the worker processes checking the files.
+    Parameters
+    ----------
+        timeout : Optional[float] - maximum time of checking a single file, in
+                                seconds
+        max_memory : Optional[int] - limit of the address space of each worker, in
+                                megabytes
+        jobs : Optional[int] - number of worker processes, defaults to the number of
+                                CPUs
+    """
+
+    timeout: Optional[float] = None
+    max_memory: Optional[int] = None
+    jobs: Optional[int] = None
+
+
+class _Worker:
+    """
+    A worker process checking one file at a time.
+    Parameters
+    ----------
+        check : CheckFunction - picklable function checking a single file
+        use_stubs : bool - if True, the worker builds its own stub index
+        max_memory : Optional[int] - limit of the address space of the worker, in
+                                megabytes
+    """
+
+    def __init__(
+        self,
+        check: CheckFunction,
+        use_stubs: bool,
+        max_memory: Optional[int],
+    ) -> None:
+        self.connection, child_connection = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_serve,
+            args=(child_connection, check, use_stubs, max_memory),
+            daemon=True,
+        )
+        self.process.start()
+        child_connection.close()
+        self.task: Optional[Tuple[int, str]] = None
+        self.deadline = float("inf")
+
+    def submit(self, index: int, filename: str, settings: Any, timeout: float) -> None:
+        """Sends a file to the worker"""
+        self.task = (index, filename)
+        self.deadline = time.monotonic() + timeout
+        self.connection.send((filename, settings))
+
+    def kill(self) -> None:
+        """Terminates the worker process"""
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+    def stop(self) -> None:
+        """Asks the worker process to finish and waits for it"""
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.process.join()
+        self.connection.close()
+
+
+def _serve(
+    connection: Connection,
+    check: CheckFunction,
+    use_stubs: bool,
+    max_memory: Optional[int],
+) -> None:
+    """
+    Main loop of a worker process. Receives filenames and sends back the results.
+    Parameters
+    ----------
+        connection (Connection): connection to the parent process
+        check (CheckFunction): function checking a single file
+        use_stubs (bool): if True, a stub index is built in the worker
+        max_memory (Optional[int]): limit of the address space, in megabytes
+    """
+    if max_memory and resource is not None:
+        limit = max_memory * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    stub_index = StubIndex() if use_stubs else None
+    while True:
+        task = connection.recv()
+        if task is None:
+            break
+        filename, settings = task
+        connection.send(check(filename, settings, stub_index))
+
+
+def run_isolated(
+    tasks: Iterable[Tuple[str, Any]],
+    check: CheckFunction,
+    on_failure: Callable[[str, str], Any],
+    use_stubs: bool = False,
+    limits: ProcessLimits = ProcessLimits(),
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Checks each file in a separate worker process, so that a file that hangs or
+    crashes the interpreter costs only its own result. A worker exceeding the
+    timeout is killed and replaced. The results are yielded in the order of the
+    tasks.
+    Parameters
+    ----------
+        tasks (Iterable[Tuple[str, Any]]): filenames with the settings to check them
+        check (CheckFunction): picklable function checking a single file
+        on_failure (Callable[[str, str], Any]): builds the result of a file whose
+                            check timed out or crashed from the filename and the
+                            description of the failure
+        use_stubs (bool): if True, each worker builds its own stub index
+        limits (ProcessLimits): timeout, memory limit and number of the workers
+    Returns
+    -------
+        Iterator[Tuple[str, Any]] - filenames with the results of the check
+    """
+    pool = _WorkerPool(check, on_failure, use_stubs, limits)
+    try:
+        yield from pool.run(tasks)
+    finally:
+        pool.close()
+
+
+class _WorkerPool:
+    """
+    Worker processes checking the files of a single run.
+    Parameters
+    ----------
+        check : CheckFunction - picklable function checking a single file
+        on_failure : Callable[[str, str], Any] - builds the result of a file whose
+                            check timed out or crashed
+        use_stubs : bool - if True, each worker builds its own stub index
+        limits : ProcessLimits - timeout, memory limit and number of the workers
+    """
+
+    def __init__(
+        self,
+        check: CheckFunction,
+        on_failure: Callable[[str, str], Any],
+        use_stubs: bool,
+        limits: ProcessLimits,
+    ) -> None:
+        self.__check = check
+        self.__on_failure = on_failure
+        self.__use_stubs = use_stubs
+        self.__max_memory = limits.max_memory
+        self.__timeout = float("inf") if limits.timeout is None else limits.timeout
+        self.__workers = [
+            self.__start_worker() for _ in range(limits.jobs or os.cpu_count() or 1)
+        ]
+        self.__idle = list(self.__workers)
+
+    def run(self, tasks: Iterable[Tuple[str, Any]]) -> Iterator[Tuple[str, Any]]:
+        """Checks the files and yields the results in the order of the tasks"""
+        pending = iter(enumerate(tasks))
+        results: Dict[int, Tuple[str, Any]] = {}
+        next_index = 0
+        exhausted = False
+        while True:
+            while self.__idle and not exhausted:
+                task = next(pending, None)
+                if task is None:
+                    exhausted = True
+                    break
+                index, (filename, settings) = task
+                self.__idle.pop().submit(index, filename, settings, self.__timeout)
+            busy = [worker for worker in self.__workers if worker.task is not None]
+            if not busy:
+                break
+            wait_time = max(
+                0.0, min(worker.deadline for worker in busy) - time.monotonic()
+            )
+            ready = wait(
+                [worker.connection for worker in busy],
+                timeout=None if wait_time == float("inf") else wait_time,
+            )
+            for position, worker in enumerate(self.__workers):
+                if worker.task is not None:
+                    self.__collect(position, worker.connection in ready, results)
+            while next_index in results:
+                yield results.pop(next_index)
+                next_index += 1
+
+    def close(self) -> None:
+        """Stops the idle workers and kills the busy ones"""
+        for worker in self.__workers:
+            if worker.task is None:
+                worker.stop()
+            else:
+                worker.kill()
+
+    def __collect(
+        self, position: int, ready: bool, results: Dict[int, Tuple[str, Any]]
+    ) -> None:
+        """
+        Stores the result of a busy worker if it is ready, or the failure if it
+        crashed or timed out, in which case the worker is replaced.
+        """
+        worker = self.__workers[position]
+        index, filename = worker.task
+        if ready:
+            try:
+                results[index] = (filename, worker.connection.recv())
+                worker.task, worker.deadline = None, float("inf")
+                self.__idle.append(worker)
+                return
+            except EOFError:
+                worker.process.join()
+                failure = f"Checking crashed (exit code {worker.process.exitcode})"
+        elif time.monotonic() >= worker.deadline:
+            failure = f"Checking timed out after {self.__timeout} seconds"
+        else:
+            return
+        results[index] = (filename, self.__on_failure(filename, failure))
+        worker.kill()
+        self.__workers[position] = self.__start_worker()
+        self.__idle.append(self.__workers[position])
+
+    def __start_worker(self) -> _Worker:
+        """Starts a new worker process"""
+        return _Worker(self.__check, self.__use_stubs, self.__max_memory)
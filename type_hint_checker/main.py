@@ -1,64 +1,391 @@
 import argparse
+import itertools
+import math
+import os
 import re
 import sys
-from typing import List
+from functools import partial
+from typing import (
+    BinaryIO,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
 import logging
 
-from type_hint_checker.checkers import FunctionChecker, ClassChecker
+from type_hint_checker.checkers import get_checkers
+from type_hint_checker.config import ConfigResolver, Settings
+from type_hint_checker.coverage import CoverageReport, FunctionCoverage
+from type_hint_checker.exceptions import (
+    IncorrectConfigException,
+    IncorrectFileException,
+)
 from type_hint_checker.file_parser import FileParser
+from type_hint_checker.fixer import ReturnHintFixer
+from type_hint_checker.index import AnnotationIndex
+from type_hint_checker.isolation import ProcessLimits, run_isolated
+from type_hint_checker.notebook import get_cell_name, read_code_cells
+from type_hint_checker.rules import (
+    CoverageRule,
+    ResultSink,
+    StringAnnotationRule,
+    TargetVersionRule,
+)
+from type_hint_checker.sampling import Sample, parse_sample_size
+from type_hint_checker.stubs import StubIndex, StubSignature
+from type_hint_checker.summary import CodeOwners, ViolationSummary
+from type_hint_checker.versions import check_target_version, get_version_policy
 
 logger = logging.getLogger("type_hint_checker")
 logging.basicConfig()
 
+FILE_LIST_CHUNK_SIZE = 64 * 1024
+SUMMARY_MAX_MESSAGES = 20
+
+
+class CheckOptions(NamedTuple):
+    """
+    Options of a check, besides the options excluding the parameters and the items.
+    Parameters
+    ----------
+        check_string_annotations : bool - if True, string type hints that are not
+                            valid python expressions are reported
+        target_version : str - if provided, e.g. "3.8", the files are parsed with
+                            the grammar of this python version and the type hints
+                            it does not support are reported
+        use_stubs : bool - if True, type hints declared in a .pyi stub lying next to
+                            the file are treated as present
+        use_config : bool - if True, the options are overridden by the nearest
+                            pyproject.toml or setup.cfg of each file
+        config_resolver : Optional[ConfigResolver] - if provided, it resolves the
+                            options of each file instead, and can be shared by
+                            many checks
+        timeout : Optional[float] - if provided, files are checked in separate
+                            processes and a file taking more seconds is reported
+        max_memory : Optional[int] - if provided, files are checked in separate
+                            processes limited to this many megabytes of memory
+        jobs : Optional[int] - number of the separate processes, defaults to the
+                            number of CPUs
+        coverage_report : Optional[CoverageReport] - if provided, the coverage of
+                            the checked files is recorded in the report
+        annotation_index : Optional[AnnotationIndex] - if provided, the type hint
+                            status of the functions of changed files is written to
+                            the index
+        summary : Optional[ViolationSummary] - if provided, the errors are counted
+                            by directory, file and owner
+        max_messages : Optional[int] - if provided, at most this many errors are
+                            logged, the rest are only counted
+    """
+
+    check_string_annotations: bool = False
+    target_version: str = ""
+    use_stubs: bool = False
+    use_config: bool = False
+    config_resolver: Optional[ConfigResolver] = None
+    timeout: Optional[float] = None
+    max_memory: Optional[int] = None
+    jobs: Optional[int] = None
+    coverage_report: Optional[CoverageReport] = None
+    annotation_index: Optional[AnnotationIndex] = None
+    summary: Optional[ViolationSummary] = None
+    max_messages: Optional[int] = None
+
+
+class FileResult(NamedTuple):
+    """
+    Result of checking a single file.
+    Parameters
+    ----------
+        passed : bool - True if the file has type hints
+        errors : List[str] - descriptions of the errors found in the file
+        functions : Optional[List[FunctionCoverage]] - coverage of the functions in
+                            the file, if it was collected
+        sources : Optional[Dict[str, str]] - the checked sources by the prefix of
+                            the qualified names of their functions, if the coverage
+                            was collected
+        stub_hash : str - hash of the stub the file was checked with, empty if none
+    """
+
+    passed: bool
+    errors: List[str]
+    functions: Optional[List[FunctionCoverage]] = None
+    sources: Optional[Dict[str, str]] = None
+    stub_hash: str = ""
+
+
+def check_file(
+    filename: str,
+    settings: Settings,
+    stub_index: Optional[StubIndex] = None,
+    collect_coverage: bool = False,
+) -> FileResult:
+    """
+    Parses a single file and checks if all functions and classes in the file have
+    type hints. A file that cannot be parsed, or whose stub cannot be parsed, is
+    reported as an error. The code cells
+    of Jupyter notebooks are checked one by one.
+    Parameters
+    ----------
+        filename: str - path to the file
+        settings: Settings - options the file is checked with
+        stub_index: Optional[StubIndex] - if provided, type hints declared in the
+                            stub of the file are treated as present
+        collect_coverage: bool - if True, the coverage of the functions is returned
+    Returns
+    ----------
+        FileResult
+    """
+    if os.fspath(filename).endswith(".ipynb"):
+        return check_notebook(filename, settings, collect_coverage)
+    try:
+        file = FileParser(
+            filename,
+            excluded_names=settings.exclude_by_name,
+            ignore_comment=settings.ignore_comment,
+            target_version=settings.target_version,
+        )
+        stub_signatures = stub_index.get_signatures(filename) if stub_index else None
+        stub_hash = stub_index.get_content_hash(filename) if stub_index else ""
+    except IncorrectFileException as exc:
+        return FileResult(False, [str(exc)])
+    sink = ResultSink()
+    passed = _check_parsed_file(file, settings, sink, stub_signatures, collect_coverage)
+    if not collect_coverage:
+        return FileResult(passed, sink.errors, stub_hash=stub_hash)
+    return FileResult(passed, sink.errors, sink.functions, {"": file.source}, stub_hash)
+
+
+def check_notebook(
+    filename: str, settings: Settings, collect_coverage: bool = False
+) -> FileResult:
+    """
+    Checks if all functions and classes in the code cells of a Jupyter notebook have
+    type hints. The errors are prefixed with the number of the cell and the lines
+    are counted from the start of the cell. A cell that cannot be parsed is reported
+    and the remaining cells are still checked.
+    Parameters
+    ----------
+        filename: str - path to the notebook
+        settings: Settings - options the notebook is checked with
+        collect_coverage: bool - if True, the coverage of the functions is returned,
+                            their names prefixed with the number of the cell
+    Returns
+    ----------
+        FileResult
+    """
+    try:
+        cells = read_code_cells(filename)
+    except IncorrectFileException as exc:
+        return FileResult(False, [str(exc)])
+    passed = True
+    sink = ResultSink()
+    for cell in cells:
+        errors_before, functions_before = len(sink.errors), len(sink.functions)
+        try:
+            file = FileParser(
+                filename,
+                excluded_names=settings.exclude_by_name,
+                ignore_comment=settings.ignore_comment,
+                source=cell.source,
+                target_version=settings.target_version,
+            )
+        except IncorrectFileException:
+            passed = False
+            sink.errors.append(f"cell {cell.number}: Cell could not be parsed")
+            continue
+        passed = (
+            _check_parsed_file(file, settings, sink, None, collect_coverage) and passed
+        )
+        for index in range(errors_before, len(sink.errors)):
+            sink.errors[index] = f"cell {cell.number}: {sink.errors[index]}"
+        for index in range(functions_before, len(sink.functions)):
+            function = sink.functions[index]
+            sink.functions[index] = function._replace(
+                name=get_cell_name(cell.number, function.name)
+            )
+    if not collect_coverage:
+        return FileResult(passed, sink.errors)
+    sources = {get_cell_name(cell.number): cell.source for cell in cells}
+    return FileResult(passed, sink.errors, sink.functions, sources)
+
+
+def _check_parsed_file(
+    file: FileParser,
+    settings: Settings,
+    sink: ResultSink,
+    stub_signatures: Optional[Mapping[str, StubSignature]],
+    collect_coverage: bool,
+) -> bool:
+    """
+    Checks the functions and classes of a parsed file with the checkers shared by
+    all the files checked with the same options. Returns True if all of them have
+    type hints.
+    """
+    enabled_rules: Tuple[str, ...] = ()
+    if settings.check_string_annotations:
+        enabled_rules += (StringAnnotationRule.name,)
+    if collect_coverage:
+        enabled_rules += (CoverageRule.name,)
+    version_policy = get_version_policy(
+        settings.target_version, file.postponed_annotations
+    )
+    if version_policy is not None:
+        enabled_rules += (TargetVersionRule.name,)
+    function_checker, class_checker = get_checkers(
+        settings.exclude_parameters, enabled_rules
+    )
+    context = function_checker.create_context(sink, stub_signatures, version_policy)
+    result = True
+    for function in file.functions:
+        result = function_checker.check(function, context) and result
+    for class_ in file.classes:
+        result = class_checker.check(class_, context) and result
+    return result
+
+
+def _failed_file_result(_filename: str, failure: str) -> FileResult:
+    """Result of a file whose check timed out or crashed"""
+    return FileResult(False, [failure])
+
 
 def check_type_hints(
-    file_list: List[str],
+    file_list: Iterable[str],
     exclude_parameters: str = "^self$",
     exclude_by_name: str = "",
     ignore_comment: str = "no-check",
+    options: Optional[CheckOptions] = None,
 ) -> bool:
     """
     Iterates through the list of file paths, parses the files and checks if all
-    functions and classes in the files have type hints.
+    functions and classes in the files have type hints. Files that cannot be parsed
+    are reported and do not stop the check of the remaining files.
     Parameters
     ----------
-        file_list: List[str] - Filenames to be checked by
+        file_list: Iterable[str] - Filenames to be checked by
         exclude_parameters: str - regex specifying which parameters should not be
                             checked
         exclude_by_name: str - Regex specifying names of functions, methods and classes
                             that should not be checked
         ignore_comment : str - if this phrase appears in the comment, the item is
                                 not checked for type hints presence
+        options: Optional[CheckOptions] - the other options of the check and the
+                            reports its results are recorded in
     Returns
     ----------
         True if all files have type hints.
     """
+    options = options or CheckOptions()
+    settings = Settings(
+        exclude_parameters=exclude_parameters,
+        exclude_by_name=exclude_by_name,
+        ignore_comment=ignore_comment,
+        check_string_annotations=options.check_string_annotations,
+        target_version=options.target_version,
+    )
+    if options.use_config and options.config_resolver is None:
+        options = options._replace(config_resolver=ConfigResolver(settings))
     result = True
-    for filename in file_list:
-        file = FileParser(
-            filename,
-            excluded_names=exclude_by_name,
-            ignore_comment=ignore_comment,
+    reported = 0
+    for filename, file_result in _check_files(file_list, settings, options):
+        for error in file_result.errors:
+            if options.max_messages is None or reported < options.max_messages:
+                logger.info("%s: %s", filename, error)
+            reported += 1
+        _record_result(filename, file_result, settings, options)
+        result = file_result.passed and result
+    if options.max_messages is not None and reported > options.max_messages:
+        logger.info(
+            "%s more type hint errors were not shown", reported - options.max_messages
         )
-        function_checker = FunctionChecker(exclude_parameters=exclude_parameters)
-        class_checker = ClassChecker(exclude_parameters=exclude_parameters)
-
-        for function in file.functions:
-            result = function_checker.check(function) and result
-            function_checker.log_results(logger, filename=filename)
-        for class_ in file.classes:
-            result = class_checker.check(class_) and result
-            class_checker.log_results(logger, filename=filename)
     return result
 
 
-def parse_arguments() -> argparse.Namespace:
+def _get_file_settings(
+    filename: str, settings: Settings, options: CheckOptions
+) -> Settings:
+    """Returns the settings of a file, resolved from the configuration if enabled"""
+    if options.config_resolver is None:
+        return settings
+    return options.config_resolver.get_settings(filename)
+
+
+def _check_files(
+    file_list: Iterable[str], settings: Settings, options: CheckOptions
+) -> Iterator[Tuple[str, FileResult]]:
     """
-    Parses command line arguments.
+    Checks the files in the current process, or in separate processes if a timeout
+    or a memory limit is set, and yields their results in the order of the files.
+    """
+    tasks = (
+        (filename, _get_file_settings(filename, settings, options))
+        for filename in file_list
+    )
+    collect_coverage = (
+        options.coverage_report is not None or options.annotation_index is not None
+    )
+    check = partial(check_file, collect_coverage=collect_coverage)
+    if options.timeout is None and options.max_memory is None:
+        stub_index = StubIndex() if options.use_stubs else None
+        for filename, file_settings in tasks:
+            yield filename, check(filename, file_settings, stub_index)
+        return
+    yield from run_isolated(
+        tasks,
+        check,
+        on_failure=_failed_file_result,
+        use_stubs=options.use_stubs,
+        limits=ProcessLimits(options.timeout, options.max_memory, options.jobs),
+    )
+
+
+def _record_result(
+    filename: str, file_result: FileResult, settings: Settings, options: CheckOptions
+) -> None:
+    """Records the result of a file in the summary, coverage report and index"""
+    if options.summary is not None:
+        options.summary.add(filename, len(file_result.errors))
+    if file_result.functions is None:
+        return
+    if options.coverage_report is not None:
+        options.coverage_report.add_file(filename, file_result.functions)
+    if options.annotation_index is not None:
+        file_settings = _get_file_settings(filename, settings, options)
+        options.annotation_index.update(
+            filename,
+            file_result.functions,
+            file_result.sources or {},
+            fingerprint=repr((file_settings, options.use_stubs, file_result.stub_hash)),
+        )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Creates the parser of the command line arguments.
     """
-    parser = argparse.ArgumentParser()
+    parser = argparse.ArgumentParser(prog="type_hint_checker")
     parser.add_argument(
-        "filenames", help="Files to be checked by type_hint_checker.", nargs="+"
+        "filenames", help="Files to be checked by type_hint_checker.", nargs="*"
+    )
+    parser.add_argument(
+        "--files-from",
+        help="Read the files to be checked from this file, one per line, or from the "
+        "standard input if set to '-'. The files are checked while they are being "
+        "read.",
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        "-0",
+        "--null",
+        action="store_true",
+        help="The files read with --files-from are separated by NUL characters, as "
+        "printed by 'git ls-files -z' or 'find -print0'.",
     )
     parser.add_argument(
         "--exit_zero",
@@ -73,16 +400,17 @@ def parse_arguments() -> argparse.Namespace:
     )
     parser.add_argument(
         "--exclude_parameters",
-        help="Regex specifying which parameters should not be checked",
+        help="Regex specifying which parameters should not be checked. Default: "
+        "'^self$'",
         type=str,
-        default="^self$",
+        default=None,
     )
     parser.add_argument(
         "--exclude_by_name",
         help="Regex specifying names of functions, methods and classes that should not "
         "be checked",
         type=str,
-        default="",
+        default=None,
     )
     parser.add_argument(
         "--log-level",
@@ -96,51 +424,434 @@ def parse_arguments() -> argparse.Namespace:
         help="If this phrase appears in the comment, the item is excluded. Default : "
         "'no-check'",
         type=str,
-        default="no-check",
+        default=None,
+    )
+    parser.add_argument(
+        "--fix",
+        action="store_true",
+        help="Insert '-> None' into functions that have no return type hint and do not "
+        "return any value, and into __init__ methods, before checking the files.",
+    )
+    parser.add_argument(
+        "--check-string-annotations",
+        action="store_true",
+        default=None,
+        help="Report string type hints that are not valid python expressions.",
+    )
+    parser.add_argument(
+        "--target-version",
+        help="Python version the checked code has to run on, e.g. 3.8. The files are "
+        "parsed with its grammar, and type hints it does not support (X | Y unions "
+        "before 3.10, builtin generics like list[int] before 3.9) are reported.",
+        type=check_target_version,
+        default=None,
+    )
+    parser.add_argument(
+        "--use-stubs",
+        action="store_true",
+        help="Treat type hints declared in a .pyi stub file lying next to the checked "
+        "file as present.",
+    )
+    parser.add_argument(
+        "--no-config",
+        action="store_true",
+        help="Do not read the [tool.type_hint_checker] options from pyproject.toml "
+        "and setup.cfg files.",
     )
+    parser.add_argument(
+        "--timeout",
+        help="Check each file in a separate process and report the files whose check "
+        "takes more than this many seconds.",
+        type=float,
+        default=None,
+    )
+    parser.add_argument(
+        "--max-memory",
+        help="Check each file in a separate process limited to this many megabytes "
+        "of memory.",
+        type=int,
+        default=None,
+    )
+    parser.add_argument(
+        "--jobs",
+        help="Number of processes used with --timeout or --max-memory. Default: the "
+        "number of CPUs",
+        type=int,
+        default=None,
+    )
+    parser.add_argument(
+        "--coverage-report",
+        help="Path to a JSON file the type hint coverage is written to. If the file "
+        "exists, the records of the checked files are updated. A summary table is "
+        "logged as well.",
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        "--index-db",
+        help="Path to a SQLite database the type hint status of every function is "
+        "written to. Files that did not change since the previous run are skipped.",
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        "--summary",
+        action="store_true",
+        help="Log the number of type hint errors in all files and the directories, "
+        "files and owners (with --codeowners) with the most errors. Only the first "
+        f"{SUMMARY_MAX_MESSAGES} errors are logged, unless --max-messages is set.",
+    )
+    parser.add_argument(
+        "--summary-top",
+        help="Number of the directories, files and owners listed in the summary. "
+        "Default: 10",
+        type=int,
+        default=10,
+    )
+    parser.add_argument(
+        "--codeowners",
+        help="Path to a CODEOWNERS file, the summary counts the errors by owner too.",
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        "--max-messages",
+        help="Log at most this many type hint errors, the rest are only counted. "
+        f"Default: all errors, {SUMMARY_MAX_MESSAGES} with --summary",
+        type=int,
+        default=None,
+    )
+    parser.add_argument(
+        "--sample",
+        help="Check only a random sample of the files, given as a fraction (e.g. 0.1) "
+        "or a number of files (e.g. 500), and log the estimated share of missing type "
+        "hints in all the files with 95%% confidence intervals.",
+        type=parse_sample_size,
+        default=None,
+    )
+    parser.add_argument(
+        "--seed",
+        help="Seed of the random sample, the same seed gives the same sample. "
+        "Default: 0",
+        type=int,
+        default=0,
+    )
+    parser.add_argument(
+        "--sample-strata",
+        help="Split the files into this many groups by size and sample each group "
+        "proportionally. Default: 1 (no stratification)",
+        type=int,
+        default=1,
+    )
+    return parser
+
 
-    args = parser.parse_args()
+def parse_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parses command line arguments.
+    Parameters
+    ----------
+        argv (Optional[List[str]]): the arguments, sys.argv[1:] if not provided
+    """
+    args = build_parser().parse_args(argv)
     return args
 
 
-def filter_files(files: List[str], exclude_pattern: str) -> List[str]:
+def read_filenames(stream: BinaryIO, separator: bytes = b"\n") -> Iterator[str]:
+    """
+    Lazily reads filenames from a stream, so that the files can be checked while
+    the rest of the list is still being produced, e.g. by `git ls-files`. The
+    stream is read in chunks of whatever data is available. Empty names are
+    skipped.
+    Parameters
+    ----------
+        stream (BinaryIO): stream with the filenames
+        separator (bytes): separator of the filenames, b"\n" or b"\0"
+    Returns
+    -------
+        Iterator[str] - the filenames
+    """
+    read = stream.read1 if hasattr(stream, "read1") else stream.read
+    remainder = b""
+    while True:
+        chunk = read(FILE_LIST_CHUNK_SIZE)
+        if not chunk:
+            break
+        *names, remainder = (remainder + chunk).split(separator)
+        for name in names:
+            if separator == b"\n":
+                name = name.rstrip(b"\r")
+            if name:
+                yield os.fsdecode(name)
+    if separator == b"\n":
+        remainder = remainder.rstrip(b"\r")
+    if remainder:
+        yield os.fsdecode(remainder)
+
+
+def iter_files(files: Iterable[str], exclude_pattern: str) -> Iterator[str]:
+    """
+    Lazy version of `filter_files`, yields the files as they come.
+    Parameters
+    ----------
+        files (Iterable[str]): Files to be checked
+        exclude_pattern (str): Regex specifying which files should not be checked
+    Returns
+    -------
+        Iterator[str] - files ending with .py or .ipynb and not excluded by the
+                        pattern
+    """
+    for filename in files:
+        if not exclude_pattern or not re.search(exclude_pattern, filename):
+            if filename.endswith((".py", ".ipynb")):
+                yield filename
+
+
+def filter_files(files: Iterable[str], exclude_pattern: str) -> List[str]:
     """
     Filters the list of files passed by pre-commit hook to exclude files by a regex.
-    Returns only filenames ending with .py
+    Returns only filenames ending with .py and Jupyter notebooks (.ipynb)
     Parameters
     ----------
-        files (List[str]): Files to be checked
+        files (Iterable[str]): Files to be checked
         exclude_pattern (str): Regex specifying which parameters should not be checked
 
     Returns
     -------
         List(str)
-            list of files ending with .py and not excluded by the pattern
+            list of files ending with .py or .ipynb and not excluded by the pattern
     """
-    result = []
-    for filename in files:
-        if not exclude_pattern or not re.search(exclude_pattern, filename):
-            if filename.endswith(".py"):
-                result.append(filename)
-    return result
+    return list(iter_files(files, exclude_pattern))
 
 
-def main() -> None:
-    """Reads the command line arguments and runs the type_hint_checker"""
-    args = parse_arguments()
-    logger.setLevel(args.log_level)
-    logger.debug(vars(args))
-    files = filter_files(files=args.filenames, exclude_pattern=args.exclude_files)
-    logger.debug("Files: %s", files)
-    exit_code = 1 - check_type_hints(
-        files,
-        exclude_parameters=args.exclude_parameters,
-        exclude_by_name=args.exclude_by_name,
-        ignore_comment=args.ignore_comment,
+def log_estimates(sample: Sample, coverage_report: CoverageReport, seed: int) -> None:
+    """
+    Logs the share of missing type hints in all files, estimated from the sample.
+    Parameters
+    ----------
+        sample (Sample): the checked sample of files
+        coverage_report (CoverageReport): coverage of the sampled files
+        seed (int): seed the sample was drawn with
+    """
+    logger.info(
+        "Sampled %s of %s files (seed %s)",
+        len(sample.files),
+        sample.population_size,
+        seed,
     )
-    if not args.exit_zero and exit_code:
-        sys.exit(exit_code)
+    for description, estimate in sample.estimate(coverage_report).items():
+        if math.isnan(estimate.lower):
+            logger.info(
+                "%s: %.1f%% (confidence interval undefined, sample at least 2 files "
+                "per stratum)",
+                description,
+                100 * estimate.value,
+            )
+            continue
+        logger.info(
+            "%s: %.1f%% (95%% confidence interval: %.1f%% - %.1f%%)",
+            description,
+            100 * estimate.value,
+            100 * estimate.lower,
+            100 * estimate.upper,
+        )
+
+
+class Runner:  # pylint: disable=too-few-public-methods
+    """
+    Runs the type_hint_checker in the current process, for one set of command line
+    arguments at a time. The argument parser and the configuration resolved from
+    pyproject.toml and setup.cfg files are kept between the runs, so a single runner
+    can be reused for many invocations. Create a new runner if the configuration
+    files change.
+    """
+
+    def __init__(self) -> None:
+        self.__parser = build_parser()
+        self.__config_resolvers: Dict[
+            Tuple[Settings, FrozenSet[str]], ConfigResolver
+        ] = {}
+
+    def run(self, argv: Optional[List[str]] = None) -> int:
+        """
+        Runs the type_hint_checker with the command line arguments.
+        Parameters
+        ----------
+            argv (Optional[List[str]]): the arguments, sys.argv[1:] if not provided
+        Returns
+        -------
+            int - the exit code, 0 if all files have type hints or --exit_zero is set
+        """
+        try:
+            args = self.__parser.parse_args(argv)
+            if not args.filenames and args.files_from is None:
+                self.__parser.error("the filenames or --files-from are required")
+        except SystemExit as exc:
+            return exc.code if isinstance(exc.code, int) else int(exc.code is not None)
+        logger.setLevel(args.log_level)
+        logger.debug(vars(args))
+        try:
+            return self.__run(args)
+        except IncorrectConfigException as exc:
+            return self.__usage_error(str(exc))
+
+    def __run(self, args: argparse.Namespace) -> int:
+        """Reads the files to be checked and checks them"""
+        if args.files_from is None:
+            files: Iterable[str] = filter_files(
+                files=args.filenames, exclude_pattern=args.exclude_files
+            )
+            logger.debug("Files: %s", files)
+            return self.__check(args, files)
+        separator = b"\0" if args.null else b"\n"
+        if args.files_from == "-":
+            files = self.__stream_files(args, sys.stdin.buffer, separator)
+            return self.__check(args, files)
+        try:
+            stream = open(args.files_from, "rb")  # pylint: disable=consider-using-with
+        except OSError as exc:
+            return self.__usage_error(
+                f"--files-from: cannot read {args.files_from}: {exc.strerror}"
+            )
+        with stream:
+            return self.__check(args, self.__stream_files(args, stream, separator))
+
+    def __usage_error(self, message: str) -> int:
+        """Prints the usage and the error message and returns the exit code"""
+        try:
+            self.__parser.error(message)
+        except SystemExit as exc:
+            return exc.code if isinstance(exc.code, int) else int(exc.code is not None)
+        return 2
+
+    def __stream_files(
+        self, args: argparse.Namespace, stream: BinaryIO, separator: bytes
+    ) -> Iterable[str]:
+        """
+        Returns the positional files followed by the files read from the stream.
+        The files are read lazily, unless all of them are needed before checking,
+        i.e. with --fix or --sample.
+        """
+        files = iter_files(
+            itertools.chain(args.filenames, read_filenames(stream, separator)),
+            exclude_pattern=args.exclude_files,
+        )
+        if args.fix or args.sample:
+            return list(files)
+        return files
+
+    def __check(self, args: argparse.Namespace, files: Iterable[str]) -> int:
+        """
+        Checks the files with the parsed command line arguments.
+        Parameters
+        ----------
+            args (argparse.Namespace): the parsed arguments
+            files (Iterable[str]): the filtered files to be checked
+        Returns
+        -------
+            int - the exit code
+        """
+        settings, config_resolver = self.__resolve_settings(args)
+        if args.fix:
+            fixer = ReturnHintFixer(
+                excluded_names=settings.exclude_by_name,
+                ignore_comment=settings.ignore_comment,
+                config_resolver=config_resolver,
+            )
+            logger.info("Inserted %s return type hints", fixer.fix_files(files))
+        coverage_report = None
+        if args.coverage_report:
+            coverage_report = CoverageReport.load(args.coverage_report)
+        sample = None
+        if args.sample:
+            sample = Sample(
+                files, args.sample, seed=args.seed, strata=args.sample_strata
+            )
+            files = sample.files
+            if coverage_report is None:
+                coverage_report = CoverageReport()
+        summary = None
+        max_messages = args.max_messages
+        if args.summary:
+            code_owners = CodeOwners(args.codeowners) if args.codeowners else None
+            summary = ViolationSummary(code_owners)
+            if max_messages is None:
+                max_messages = SUMMARY_MAX_MESSAGES
+        options = CheckOptions(
+            check_string_annotations=settings.check_string_annotations,
+            target_version=settings.target_version,
+            use_stubs=args.use_stubs,
+            config_resolver=config_resolver,
+            timeout=args.timeout,
+            max_memory=args.max_memory,
+            jobs=args.jobs,
+            coverage_report=coverage_report,
+            annotation_index=AnnotationIndex(args.index_db) if args.index_db else None,
+            summary=summary,
+            max_messages=max_messages,
+        )
+        exit_code = 1 - check_type_hints(
+            files,
+            exclude_parameters=settings.exclude_parameters,
+            exclude_by_name=settings.exclude_by_name,
+            ignore_comment=settings.ignore_comment,
+            options=options,
+        )
+        self.__report(args, options, sample)
+        if args.exit_zero:
+            return 0
+        return exit_code
+
+    def __resolve_settings(
+        self, args: argparse.Namespace
+    ) -> Tuple[Settings, Optional[ConfigResolver]]:
+        """
+        Returns the settings given on the command line and the resolver of the
+        configuration files, which never override the options given explicitly.
+        """
+        explicit = {
+            name: getattr(args, name)
+            for name in Settings._fields
+            if getattr(args, name) is not None
+        }
+        settings = Settings(**explicit)
+        if args.no_config:
+            return settings, None
+        key = (settings, frozenset(explicit))
+        if key not in self.__config_resolvers:
+            self.__config_resolvers[key] = ConfigResolver(*key)
+        return settings, self.__config_resolvers[key]
+
+    @staticmethod
+    def __report(
+        args: argparse.Namespace, options: CheckOptions, sample: Optional[Sample]
+    ) -> None:
+        """Saves and logs the reports filled in by the check"""
+        if options.annotation_index is not None:
+            options.annotation_index.close()
+        if args.coverage_report:
+            options.coverage_report.save(args.coverage_report)
+            for line in options.coverage_report.format_table():
+                logger.info(line)
+        if sample is not None:
+            log_estimates(sample, options.coverage_report, seed=args.seed)
+        if options.summary is not None:
+            for line in options.summary.format_lines(top=args.summary_top):
+                logger.info(line)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Reads the command line arguments and runs the type_hint_checker
+    Parameters
+    ----------
+        argv (Optional[List[str]]): the arguments, sys.argv[1:] if not provided
+    Returns
+    -------
+        int - the exit code
+    """
+    return Runner().run(argv)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
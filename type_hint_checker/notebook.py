@@ -0,0 +1,347 @@
+import json
+import re
+from typing import IO, Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from type_hint_checker.exceptions import IncorrectFileException
+
+NOTEBOOK_CHUNK_SIZE = 64 * 1024
+PYTHON_CELL_MAGICS = {"time", "timeit", "capture", "prun"}
+
+_STRING_SPECIAL = re.compile(r'["\\]')
+_CONTAINER_SPECIAL = re.compile(r'["\[\]{}]')
+_MAGIC_LINE = re.compile(r"^(\s*)(?:[%?]|!(?!=)|[\w.,\s]+=\s*(?:%|!(?!=)))")
+_LINE_SPECIAL = re.compile(r"\\.?|'''|\"\"\"|['\"#()\[\]{}]")
+_HELP_LINE = re.compile(r"^(\s*)[\w.]+\?{1,2}\s*$")
+
+
+class NotebookCell(NamedTuple):
+    """
+    Code cell of a Jupyter notebook.
+    Parameters
+    ----------
+        number : int - position of the cell in the notebook, counting all cells
+                        from 1
+        source : str - python source of the cell, with IPython magics replaced
+    """
+
+    number: int
+    source: str
+
+
+class _JsonScanner:
+    """
+    Minimal incremental reader of a JSON document. Values that are not needed are
+    skipped without being built, so large strings, e.g. base64 encoded images in the
+    outputs of a notebook, never have to be kept in memory as a whole.
+    Parameters
+    ----------
+        file : IO[str] - the JSON document
+        filename : str - path to the document, used in error messages
+    """
+
+    def __init__(self, file: IO[str], filename: str) -> None:
+        self.__file = file
+        self.__filename = filename
+        self.__buffer = ""
+        self.__position = 0
+
+    def expect(self, char: str) -> None:
+        """Consumes the next non-whitespace character, which has to be `char`"""
+        if self.next() != char:
+            self.__error()
+
+    def next(self) -> str:
+        """Consumes and returns the next non-whitespace character"""
+        char = self.peek()
+        self.__position += 1
+        return char
+
+    def peek(self) -> str:
+        """Returns the next non-whitespace character without consuming it"""
+        while True:
+            if not self.__fill(1):
+                self.__error()
+            char = self.__buffer[self.__position]
+            if not char.isspace():
+                return char
+            self.__position += 1
+
+    def items(self, end: str) -> Iterator[None]:
+        """
+        Iterates over the items of the object or array whose opening bracket was
+        consumed, consuming the separating commas and the closing bracket `end`.
+        """
+        if self.peek() == end:
+            self.next()
+            return
+        while True:
+            yield
+            char = self.next()
+            if char == end:
+                return
+            if char != ",":
+                self.__error()
+
+    def read_key(self) -> str:
+        """Reads the key of an object member, including the colon"""
+        self.expect('"')
+        key = self.__read_string()
+        self.expect(":")
+        return key
+
+    def read_value(self) -> Any:
+        """Reads a whole value"""
+        start = self.peek()
+        if start == '"':
+            self.next()
+            return self.__read_string()
+        if start in "[{":
+            return json.loads(self.__scan_container(keep=True))
+        return json.loads(self.__scan_literal())
+
+    def skip_value(self) -> None:
+        """Consumes a value without building it"""
+        start = self.peek()
+        if start == '"':
+            self.next()
+            self.__scan_string(keep=False)
+        elif start in "[{":
+            self.__scan_container(keep=False)
+        else:
+            self.__scan_literal()
+
+    def __read_string(self) -> str:
+        """Reads the rest of a string whose opening quote was consumed"""
+        return json.loads('"' + self.__scan_string(keep=True) + '"')
+
+    def __scan_string(self, keep: bool) -> str:
+        """
+        Consumes the rest of a string whose opening quote was consumed and returns
+        its raw content, or an empty string if `keep` is False.
+        """
+        parts: List[str] = []
+        while True:
+            if not self.__fill(1):
+                self.__error()
+            match = _STRING_SPECIAL.search(self.__buffer, self.__position)
+            end = match.start() if match else len(self.__buffer)
+            if keep:
+                parts.append(self.__buffer[self.__position : end])
+            self.__position = end
+            if not match:
+                continue
+            if match.group() == '"':
+                self.__position += 1
+                return "".join(parts)
+            if not self.__fill(2):
+                self.__error()
+            if keep:
+                parts.append(self.__buffer[self.__position : self.__position + 2])
+            self.__position += 2
+
+    def __scan_container(self, keep: bool) -> str:
+        """
+        Consumes an object or an array and returns its raw text, or an empty
+        string if `keep` is False.
+        """
+        parts: List[str] = []
+        depth = 0
+        while True:
+            if not self.__fill(1):
+                self.__error()
+            match = _CONTAINER_SPECIAL.search(self.__buffer, self.__position)
+            end = match.end() if match else len(self.__buffer)
+            if keep:
+                parts.append(self.__buffer[self.__position : end])
+            self.__position = end
+            if not match:
+                continue
+            char = match.group()
+            if char == '"':
+                string = self.__scan_string(keep)
+                if keep:
+                    parts.append(string + '"')
+            elif char in "[{":
+                depth += 1
+            else:
+                depth -= 1
+                if not depth:
+                    return "".join(parts)
+
+    def __scan_literal(self) -> str:
+        """Consumes a number, true, false or null and returns its text"""
+        parts: List[str] = []
+        while self.__fill(1):
+            char = self.__buffer[self.__position]
+            if char in ",]}" or char.isspace():
+                break
+            parts.append(char)
+            self.__position += 1
+        return "".join(parts)
+
+    def __fill(self, size: int) -> bool:
+        """
+        Reads more of the document until at least `size` characters are available
+        at the current position. The consumed part of the buffer is dropped.
+        Returns False at the end of the document.
+        """
+        while len(self.__buffer) - self.__position < size:
+            chunk = self.__file.read(NOTEBOOK_CHUNK_SIZE)
+            if not chunk:
+                return False
+            self.__buffer = self.__buffer[self.__position :] + chunk
+            self.__position = 0
+        return True
+
+    def __error(self) -> None:
+        """Reports an invalid document"""
+        raise IncorrectFileException(f"Notebook could not be parsed: {self.__filename}")
+
+
+def read_code_cells(filename: str) -> List[NotebookCell]:
+    """
+    Reads the code cells of a Jupyter notebook. The notebook is scanned
+    incrementally and the outputs, attachments and metadata of the cells are
+    skipped without being loaded. Notebooks of other languages than python have
+    no code cells to be checked.
+    Parameters
+    ----------
+        filename (str): path to the notebook
+    Returns
+    -------
+        List[NotebookCell] - the code cells
+    """
+    cells: List[NotebookCell] = []
+    language = "python"
+    try:
+        with open(filename, "r", encoding="utf-8") as file:
+            scanner = _JsonScanner(file, filename)
+            scanner.expect("{")
+            for _ in scanner.items("}"):
+                key = scanner.read_key()
+                if key == "cells":
+                    scanner.expect("[")
+                    for number, _ in enumerate(scanner.items("]"), start=1):
+                        cell = _read_cell(scanner, number)
+                        if cell is not None:
+                            cells.append(cell)
+                elif key == "metadata":
+                    metadata = scanner.read_value()
+                    if isinstance(metadata, dict):
+                        language = _get_language(metadata) or language
+                else:
+                    scanner.skip_value()
+    except (UnicodeDecodeError, ValueError) as exc:
+        raise IncorrectFileException(
+            f"Notebook could not be parsed: {filename}"
+        ) from exc
+    except OSError as exc:
+        raise IncorrectFileException(f"Notebook could not be read: {filename}") from exc
+    return cells if language == "python" else []
+
+
+def _read_cell(scanner: _JsonScanner, number: int) -> Optional[NotebookCell]:
+    """Reads a cell and returns it if it is a code cell"""
+    cell_type, source = None, ""
+    scanner.expect("{")
+    for _ in scanner.items("}"):
+        key = scanner.read_key()
+        if key == "cell_type":
+            cell_type = scanner.read_value()
+        elif key == "source":
+            source = scanner.read_value()
+            if isinstance(source, list):
+                source = "".join(source)
+        else:
+            scanner.skip_value()
+    if cell_type != "code":
+        return None
+    return NotebookCell(number, strip_magics(source))
+
+
+def _get_language(metadata: Dict[str, Any]) -> str:
+    """Returns the language of the notebook declared in its metadata"""
+    language_info = metadata.get("language_info") or {}
+    kernelspec = metadata.get("kernelspec") or {}
+    return str(language_info.get("name") or kernelspec.get("language") or "").lower()
+
+
+def get_cell_name(number: int, name: str = "") -> str:
+    """
+    Qualifies the name of a function or class defined in a code cell with the
+    number of the cell, e.g. `cell3.Class.method`.
+    Parameters
+    ----------
+        number (int): number of the cell
+        name (str): qualified name of the function within the cell, empty for the
+                    prefix of all the names of the cell
+    Returns
+    -------
+        str
+    """
+    return f"cell{number}.{name}"
+
+
+def strip_magics(source: str) -> str:
+    """
+    Replaces IPython magics, shell commands and help requests with `pass`, keeping
+    the indentation and the line numbers. Only lines starting a logical line are
+    replaced, so continuation lines inside brackets, strings or after a backslash,
+    e.g. `    % b`, stay python. A cell with a cell magic running
+    something else than python, e.g. `%%bash`, becomes empty.
+    Parameters
+    ----------
+        source (str): source of a code cell
+    Returns
+    -------
+        str - python source
+    """
+    lines = source.split("\n")
+    if lines[0].startswith("%%"):
+        magic = lines[0][2:].split()
+        if not magic or magic[0] not in PYTHON_CELL_MAGICS:
+            return ""
+        lines[0] = ""
+    depth, quote, continued = 0, "", False
+    for index, line in enumerate(lines):
+        if not (depth or quote or continued):
+            match = _MAGIC_LINE.match(line) or _HELP_LINE.match(line)
+            if match:
+                lines[index] = match.group(1) + "pass"
+                continue
+        depth, quote, continued = _scan_line(line, depth, quote)
+    return "\n".join(lines)
+
+
+def _scan_line(line: str, depth: int, quote: str) -> Tuple[int, str, bool]:
+    """
+    Follows the brackets and the strings of a line of python source, so that only
+    the lines starting a logical line are taken for magics.
+    Parameters
+    ----------
+        line (str): the line
+        depth (int): number of the brackets open before the line
+        quote (str): quote of the string open before the line, empty if none
+    Returns
+    -------
+        Tuple[int, str, bool] - the number of the open brackets and the quote of
+                                the open string after the line, and True if the line
+                                ends with a backslash continuation
+    """
+    for match in _LINE_SPECIAL.finditer(line):
+        token = match.group()
+        if token == "\\":
+            return depth, quote, True
+        if quote:
+            if token == quote:
+                quote = ""
+        elif token == "#":
+            break
+        elif token[0] in "'\"":
+            quote = token
+        elif token in "([{":
+            depth += 1
+        elif token in ")]}":
+            depth = max(depth - 1, 0)
+    # a string in single quotes cannot continue on the next line without a backslash
+    return depth, quote if len(quote) == 3 else "", False
@@ -0,0 +1,682 @@
+import ast
+import sys
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from importlib import metadata
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+
+from type_hint_checker.config import compile_pattern
+from type_hint_checker.coverage import FunctionCoverage
+from type_hint_checker.stubs import StubSignature
+from type_hint_checker.versions import (
+    BUILTIN_GENERICS,
+    BUILTIN_GENERICS_VERSION,
+    UNION_OPERATOR_VERSION,
+    VersionPolicy,
+    format_version,
+)
+
+ENTRY_POINT_GROUP = "type_hint_checker.rules"
+ANNOTATION_CACHE_SIZE = 4096
+
+
+class ResultSink:  # pylint: disable=too-few-public-methods
+    """
+    Receives the results of the checks. A sink is supplied by the caller, so the
+    results of many items, or files, can be collected without intermediate lists.
+    Parameters
+    ----------
+        errors (List[str]): the error messages reported by the rules
+        functions (List[FunctionCoverage]): the coverage of the checked functions
+    """
+
+    def __init__(self) -> None:
+        self.errors: List[str] = []
+        self.functions: List[FunctionCoverage] = []
+
+    def clear(self) -> None:
+        """Removes the collected results, so the sink can be reused"""
+        self.errors.clear()
+        self.functions.clear()
+
+
+class TypeHint(NamedTuple):
+    """
+    Type hint of a checked function whose nodes are being dispatched.
+    Parameters
+    ----------
+        function (ast.FunctionDef): the function the type hint belongs to
+        description (str): which type hint of the function it is, e.g.
+                                "type hint of parameter a" or "return type hint"
+        reported (Set[str]): problems of the type hint already reported, shared by
+                                all its nodes, so each problem can be reported once
+        value (bool): True inside the content of Literal[...] and the metadata of
+                                Annotated[...], which are values, not type hints
+    """
+
+    function: ast.FunctionDef
+    description: str
+    reported: Set[str]
+    value: bool = False
+
+
+# scope, nested, signature and type hint a node is dispatched with
+_State = Tuple[List[str], bool, Optional[ast.FunctionDef], Optional[TypeHint]]
+_Visit = Tuple[ast.AST, List[str], bool, Optional[ast.FunctionDef], Optional[TypeHint]]
+# fields that can contain statements, the only ones traversed for statement rules
+_STATEMENT_FIELDS = ("body", "orelse", "finalbody", "handlers", "cases")
+
+
+class RuleContext:  # pylint: disable=too-many-instance-attributes
+    """
+    State shared by all rules while the items of a file are being checked. While a
+    node is dispatched, `scope` holds the names of the enclosing classes and
+    functions, `nested` is True inside function bodies and nested classes, whose
+    functions are not checked, and `type_hint` describes the type hint of a checked
+    function the node belongs to, if any.
+    Parameters
+    ----------
+        exclude_parameters (str): regex specifying which parameters should not be
+                                checked
+        sink (Optional[ResultSink]): sink the errors and the coverage are written to
+        stub_signatures (Optional[Mapping[str, StubSignature]]): signatures declared
+                                in the stub of the checked file
+        version_policy (Optional[VersionPolicy]): type hint features supported by
+                                the targeted python version, None if all are
+    """
+
+    def __init__(
+        self,
+        exclude_parameters: str = "",
+        sink: Optional[ResultSink] = None,
+        stub_signatures: Optional[Mapping[str, StubSignature]] = None,
+        version_policy: Optional[VersionPolicy] = None,
+    ) -> None:
+        self.exclude_parameters = exclude_parameters
+        self.sink = ResultSink() if sink is None else sink
+        self.stub_signatures = stub_signatures or {}
+        self.version_policy = version_policy
+        self.scope: List[str] = []
+        self.nested = False
+        self.type_hint: Optional[TypeHint] = None
+        self.__pattern = compile_pattern(exclude_parameters)
+        self.__last_function: Optional[ast.FunctionDef] = None
+        self.__missing_parameters: Tuple[str, ...] = ()
+        self.__checked_parameters = 0
+
+    @property
+    def errors(self) -> List[str]:
+        """The errors reported to the sink"""
+        return self.sink.errors
+
+    @property
+    def functions(self) -> List[FunctionCoverage]:
+        """The coverage of the functions recorded in the sink"""
+        return self.sink.functions
+
+    def report(self, message: str) -> None:
+        """
+        Records an error found by a rule.
+        Parameters
+        ----------
+            message (str): description of the error
+        """
+        self.sink.errors.append(message)
+
+    def get_missing_parameters(self, function: ast.FunctionDef) -> Tuple[str, ...]:
+        """
+        Returns the names of the checked parameters without type hints, neither in
+        the function nor in its stub.
+        Parameters
+        ----------
+            function (ast.FunctionDef): the function defined in the checked scope
+        Returns
+        -------
+            Tuple[str, ...]
+        """
+        self.__inspect_parameters(function)
+        return self.__missing_parameters
+
+    def count_checked_parameters(self, function: ast.FunctionDef) -> int:
+        """
+        Returns the number of the parameters of the function that are not excluded.
+        Parameters
+        ----------
+            function (ast.FunctionDef): the function defined in the checked scope
+        Returns
+        -------
+            int
+        """
+        self.__inspect_parameters(function)
+        return self.__checked_parameters
+
+    def get_checked_parameters(self, function: ast.FunctionDef) -> List[ast.arg]:
+        """
+        Returns the parameters of the function that are not excluded.
+        Parameters
+        ----------
+            function (ast.FunctionDef): the function defined in the checked scope
+        Returns
+        -------
+            List[ast.arg]
+        """
+        return [
+            parameter
+            for parameter in function.args.args
+            if not self.is_parameter_excluded(parameter.arg)
+        ]
+
+    def has_return(self, function: ast.FunctionDef) -> bool:
+        """
+        Returns True if the return type hint is provided in the function or its stub.
+        Parameters
+        ----------
+            function (ast.FunctionDef): the function defined in the checked scope
+        Returns
+        -------
+            bool
+        """
+        if function.returns:
+            return True
+        stub = self.get_stub_signature(function)
+        return bool(stub and stub.has_return)
+
+    def get_qualified_name(self, function: ast.FunctionDef) -> str:
+        """Returns the name of the function prefixed with the enclosing classes"""
+        return ".".join([*self.scope, function.name])
+
+    def get_stub_signature(self, function: ast.FunctionDef) -> Optional[StubSignature]:
+        """
+        Returns the signature of the function declared in the stub file, if any.
+        Parameters
+        ----------
+            function (ast.FunctionDef): the function defined in the checked scope
+        Returns
+        -------
+            Optional[StubSignature]
+        """
+        if not self.stub_signatures:
+            return None
+        return self.stub_signatures.get(self.get_qualified_name(function))
+
+    def is_parameter_excluded(self, parameter: str) -> bool:
+        """Returns True if the parameter should not be checked.
+        Parameters
+        ----------
+            parameter (str): - the parameters' name
+        Returns
+        ---------
+            bool
+        """
+        return bool(self.__pattern and self.__pattern.search(parameter))
+
+    def __inspect_parameters(self, function: ast.FunctionDef) -> None:
+        """
+        Finds the checked and the missing parameters of the function in a single
+        pass. The result for the last function is kept, as several rules ask for it.
+        """
+        if function is self.__last_function:
+            return
+        stub = self.get_stub_signature(function)
+        checked = 0
+        missing = []
+        for parameter in function.args.args:
+            if self.is_parameter_excluded(parameter.arg):
+                continue
+            checked += 1
+            if not parameter.annotation and not (
+                stub and parameter.arg in stub.annotated_parameters
+            ):
+                missing.append(parameter.arg)
+        self.__last_function = function
+        self.__missing_parameters = tuple(missing)
+        self.__checked_parameters = checked
+
+
+class Rule(ABC):  # pylint: disable=too-few-public-methods
+    """
+    A single policy checked by the type hint checker. A rule subscribes to the node
+    types listed in `node_types` and is called once for every such node.
+    Rules are registered with `registry.register` or discovered through the
+    `type_hint_checker.rules` entry point group. Rules that are not enabled by
+    default have to be enabled by name.
+    """
+
+    name: str = ""
+    node_types: Tuple[Type[ast.AST], ...] = ()
+    enabled_by_default: bool = True
+
+    @abstractmethod
+    def check(self, node: ast.AST, context: RuleContext) -> None:
+        """
+        Checks a single node and reports the errors to the context.
+        Parameters
+        ----------
+            node (ast.AST): node of one of the types from `node_types`
+            context (RuleContext): context the errors are reported to
+        """
+
+
+class RuleRegistry:
+    """
+    Collection of the rules known to the type hint checker.
+    Parameters
+    ----------
+        entry_point_group (str): entry point group used to discover rules from
+                                installed plugins
+    """
+
+    def __init__(self, entry_point_group: str = ENTRY_POINT_GROUP) -> None:
+        self.__entry_point_group = entry_point_group
+        self.__rules: Dict[str, Type[Rule]] = {}
+        self.__instances: Dict[str, Rule] = {}
+        self.__entry_points_loaded = False
+
+    def register(self, rule: Type[Rule]) -> Type[Rule]:
+        """
+        Registers a rule class. Can be used as a class decorator.
+        Parameters
+        ----------
+            rule (Type[Rule]): the rule to be registered
+        Returns
+        -------
+            Type[Rule] - the registered rule
+        """
+        if not rule.name:
+            raise ValueError(f"Rule {rule.__name__} has no name")
+        self.__rules[rule.name] = rule
+        self.__instances.pop(rule.name, None)
+        return rule
+
+    def get_rules(self, enabled: Iterable[str] = ()) -> List[Rule]:
+        """
+        Returns instances of the registered rules that are enabled by default,
+        including the ones provided by plugins, and of the rules enabled by name.
+        The instances are created once and shared.
+        Parameters
+        ----------
+            enabled (Iterable[str]): names of additional rules to be enabled
+        Returns
+        -------
+            List[Rule]
+        """
+        if not self.__entry_points_loaded:
+            self.__load_entry_points()
+        enabled = set(enabled)
+        unknown = enabled.difference(self.__rules)
+        if unknown:
+            raise ValueError(f"Unknown rules: {', '.join(sorted(unknown))}")
+        result = []
+        for name, rule in self.__rules.items():
+            if rule.enabled_by_default or name in enabled:
+                if name not in self.__instances:
+                    self.__instances[name] = rule()
+                result.append(self.__instances[name])
+        return result
+
+    def __load_entry_points(self) -> None:
+        """Registers the rules exposed by installed plugins"""
+        self.__entry_points_loaded = True
+        entry_points = metadata.entry_points()
+        if hasattr(entry_points, "select"):
+            group = entry_points.select(group=self.__entry_point_group)
+        else:
+            group = entry_points.get(self.__entry_point_group, [])
+        for entry_point in group:
+            self.register(entry_point.load())
+
+
+class RuleEngine:  # pylint: disable=too-few-public-methods
+    """
+    Traverses the checked items once and dispatches every node to all the rules
+    interested in its type. If the rules subscribe to statements only, expressions
+    cannot contain a subscribed node, so they are not traversed.
+    Parameters
+    ----------
+        rules (Sequence[Rule]): rules to be run
+    """
+
+    def __init__(self, rules: Sequence[Rule]) -> None:
+        self.__rules = rules
+        self.__dispatch: Dict[type, Tuple[Rule, ...]] = {}
+        statements_only = all(
+            issubclass(node_type, ast.stmt)
+            for rule in rules
+            for node_type in rule.node_types
+        )
+        self.__statements_only = statements_only
+        self.__fields: Dict[type, Tuple[str, ...]] = {}
+
+    def run(self, item: ast.AST, context: RuleContext) -> None:
+        """
+        Runs the rules on a top level item of a file, dispatching every node of the
+        item before its children. The traversal keeps its own stack, so deeply nested
+        expressions do not hit the recursion limit.
+        Parameters
+        ----------
+            item (ast.AST): function or class to be checked
+            context (RuleContext): context the errors are reported to
+        """
+        outer_scope, outer_nested = context.scope, context.nested
+        values: Set[ast.AST] = set()
+        stack: List[_Visit] = [(item, outer_scope, outer_nested, None, None)]
+        try:
+            while stack:
+                node, scope, nested, signature, type_hint = stack.pop()
+                context.scope, context.nested = scope, nested
+                context.type_hint = type_hint
+                self.__dispatch_node(node, context)
+                fields = self.__fields.get(type(node))
+                if fields is None:
+                    fields = self.__get_fields(type(node))
+                if fields:
+                    children = list(
+                        self.__get_children(node, fields, context, signature, values)
+                    )
+                    children.reverse()
+                    stack.extend(children)
+        finally:
+            context.scope, context.nested = outer_scope, outer_nested
+            context.type_hint = None
+
+    def __get_fields(self, node_type: type) -> Tuple[str, ...]:
+        """Returns the fields of the node type that are traversed"""
+        fields = tuple(
+            field
+            for field in node_type._fields
+            if not self.__statements_only or field in _STATEMENT_FIELDS
+        )
+        self.__fields[node_type] = fields
+        return fields
+
+    @staticmethod
+    def __get_children(
+        node: ast.AST,
+        fields: Tuple[str, ...],
+        context: RuleContext,
+        signature: Optional[ast.FunctionDef],
+        values: Set[ast.AST],
+    ) -> Iterator[_Visit]:
+        """
+        Yields the children of the node with the state they are dispatched in.
+        Parameters
+        ----------
+            node (ast.AST): the dispatched node
+            fields (Tuple[str, ...]): fields of the node that are traversed
+            context (RuleContext): context holding the state of the node
+            signature (Optional[ast.FunctionDef]): the checked function, if the node
+                                is a part of its parameters
+            values (Set[ast.AST]): arguments of the subscripted type hints that are
+                                values, found so far in the traversed item
+        Returns
+        -------
+            Iterator[_Visit]
+        """
+        scope, nested, type_hint = context.scope, context.nested, context.type_hint
+        state: _State = (scope, nested, None, type_hint)
+        field_states = _get_field_states(node, fields, context, signature)
+        if isinstance(node, ast.Subscript) and type_hint and not type_hint.value:
+            values.update(_get_value_arguments(node))
+        for field in fields:
+            value = getattr(node, field, None)
+            child_state = field_states.get(field, state)
+            for child in value if isinstance(value, list) else (value,):
+                if not isinstance(child, ast.AST):
+                    continue
+                if child in values:
+                    yield child, scope, nested, None, type_hint._replace(value=True)
+                else:
+                    yield (child, *child_state)
+
+    def __dispatch_node(self, node: ast.AST, context: RuleContext) -> None:
+        """Calls every rule subscribed to the type of the node"""
+        node_type = type(node)
+        rules = self.__dispatch.get(node_type)
+        if rules is None:
+            rules = tuple(
+                rule for rule in self.__rules if issubclass(node_type, rule.node_types)
+            )
+            self.__dispatch[node_type] = rules
+        for rule in rules:
+            rule.check(node, context)
+
+
+def _get_field_states(
+    node: ast.AST,
+    fields: Tuple[str, ...],
+    context: RuleContext,
+    signature: Optional[ast.FunctionDef],
+) -> Dict[str, _State]:
+    """
+    Returns the states the fields of the node are dispatched in, where they differ
+    from the state of the node: the bodies of classes and functions are entered,
+    and the type hints of checked functions are marked.
+    Parameters
+    ----------
+        node (ast.AST): the dispatched node
+        fields (Tuple[str, ...]): fields of the node that are traversed
+        context (RuleContext): context holding the state of the node
+        signature (Optional[ast.FunctionDef]): the checked function, if the node is
+                                a part of its parameters
+    Returns
+    -------
+        Dict[str, _State]
+    """
+    scope, nested = context.scope, context.nested
+    field_states: Dict[str, _State] = {}
+    if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+        # the methods of nested classes are not checked
+        body_nested = nested or bool(scope) or not isinstance(node, ast.ClassDef)
+        field_states["body"] = ([*scope, node.name], body_nested, None, None)
+        checked = isinstance(node, ast.FunctionDef) and not nested
+        if checked and "returns" in fields:
+            returns = TypeHint(node, "return type hint", set())
+            field_states["args"] = (scope, nested, node, None)
+            field_states["returns"] = (scope, nested, None, returns)
+    elif isinstance(node, ast.arguments) and signature is not None:
+        for field in ("posonlyargs", "args", "vararg", "kwonlyargs", "kwarg"):
+            field_states[field] = (scope, nested, signature, None)
+    elif isinstance(node, ast.arg) and signature is not None:
+        description = f"type hint of parameter {node.arg}"
+        annotation = TypeHint(signature, description, set())
+        field_states["annotation"] = (scope, nested, None, annotation)
+    return field_states
+
+
+def _get_value_arguments(subscript: ast.Subscript) -> List[ast.AST]:
+    """
+    Returns the arguments of a subscripted type hint that are values rather than
+    type hints: the content of Literal[...] and the metadata of Annotated[...].
+    Parameters
+    ----------
+        subscript (ast.Subscript): the subscripted type hint
+    Returns
+    -------
+        List[ast.AST]
+    """
+    name = getattr(subscript.value, "attr", None)
+    name = getattr(subscript.value, "id", name)
+    if name == "Literal":
+        return [subscript.slice]
+    slice_ = subscript.slice
+    if sys.version_info < (3, 9) and isinstance(slice_, ast.Index):
+        slice_ = slice_.value
+    if name == "Annotated" and isinstance(slice_, ast.Tuple):
+        return slice_.elts[1:]
+    return []
+
+
+registry = RuleRegistry()
+
+
+@registry.register
+class ParameterAnnotationRule(Rule):  # pylint: disable=too-few-public-methods
+    """Checks that the parameters of a function have type hints."""
+
+    name = "parameter-annotation"
+    node_types = (ast.FunctionDef,)
+
+    def check(self, node: ast.FunctionDef, context: RuleContext) -> None:
+        if context.nested:
+            return
+        for parameter in context.get_missing_parameters(node):
+            context.report(
+                f"Missing type hint for parameter {parameter} "
+                f"(function {node.name}), line {node.lineno}"
+            )
+
+
+@registry.register
+class ReturnAnnotationRule(Rule):  # pylint: disable=too-few-public-methods
+    """Checks that the return type of a function is provided."""
+
+    name = "return-annotation"
+    node_types = (ast.FunctionDef,)
+
+    def check(self, node: ast.FunctionDef, context: RuleContext) -> None:
+        if not context.nested and not context.has_return(node):
+            context.report(
+                f"Missing return type hint for function {node.name}, "
+                f"line {node.lineno}"
+            )
+
+
+@registry.register
+class StringAnnotationRule(Rule):  # pylint: disable=too-few-public-methods
+    """
+    Checks that the string (forward reference) type hints of a function are valid
+    python expressions. The content of Literal[...] and the metadata of
+    Annotated[...] are skipped. Identical strings are parsed only once.
+    """
+
+    name = "string-annotation"
+    node_types = (ast.Constant,)
+    enabled_by_default = False
+
+    def check(self, node: ast.Constant, context: RuleContext) -> None:
+        type_hint = context.type_hint
+        if type_hint is None or type_hint.value or not isinstance(node.value, str):
+            return
+        if not is_valid_string_annotation(node.value):
+            context.report(
+                f"Malformed string type hint '{node.value}' "
+                f"(function {type_hint.function.name}), "
+                f"line {type_hint.function.lineno}"
+            )
+
+
+@registry.register
+class CoverageRule(Rule):  # pylint: disable=too-few-public-methods
+    """Records how many parameters and returns of each function have type hints."""
+
+    name = "coverage"
+    node_types = (ast.FunctionDef,)
+    enabled_by_default = False
+
+    def check(self, node: ast.FunctionDef, context: RuleContext) -> None:
+        if context.nested:
+            return
+        missing = context.get_missing_parameters(node)
+        parameters = context.count_checked_parameters(node)
+        context.functions.append(
+            FunctionCoverage(
+                name=context.get_qualified_name(node),
+                lineno=node.lineno,
+                end_lineno=node.end_lineno,
+                parameters=parameters,
+                annotated_parameters=parameters - len(missing),
+                has_return=context.has_return(node),
+                missing_parameters=missing,
+            )
+        )
+
+
+@registry.register
+class TargetVersionRule(Rule):  # pylint: disable=too-few-public-methods
+    """
+    Checks that the type hints of a function use only the features supported by
+    the targeted python version: `X | Y` unions (PEP 604) and subscripted builtin
+    collections, e.g. `list[int]` (PEP 585). Each feature is reported once per type
+    hint. String type hints are not evaluated, so they are not checked.
+    """
+
+    name = "target-version"
+    node_types = (ast.BinOp, ast.Subscript)
+    enabled_by_default = False
+
+    def check(
+        self, node: Union[ast.BinOp, ast.Subscript], context: RuleContext
+    ) -> None:
+        policy = context.version_policy
+        type_hint = context.type_hint
+        if policy is None or type_hint is None:
+            return
+        if isinstance(node, ast.BinOp):
+            if not policy.union_operator and isinstance(node.op, ast.BitOr):
+                self.__report_once(
+                    "|",
+                    f"Union operator in {type_hint.description} requires python "
+                    f"{format_version(UNION_OPERATOR_VERSION)}",
+                    context,
+                )
+        elif (
+            not policy.builtin_generics
+            and isinstance(node.value, ast.Name)
+            and node.value.id in BUILTIN_GENERICS
+        ):
+            self.__report_once(
+                node.value.id,
+                f"Builtin generic {node.value.id}[...] in {type_hint.description} "
+                f"requires python {format_version(BUILTIN_GENERICS_VERSION)}",
+                context,
+            )
+
+    @staticmethod
+    def __report_once(feature: str, message: str, context: RuleContext) -> None:
+        """
+        Reports the unsupported feature unless it was already reported for the type
+        hint being traversed.
+        Parameters
+        ----------
+            feature (str): the unsupported feature
+            message (str): description of the error, without the function
+            context (RuleContext): context the errors are reported to
+        """
+        type_hint = context.type_hint
+        if feature in type_hint.reported:
+            return
+        type_hint.reported.add(feature)
+        function = type_hint.function
+        context.report(f"{message} (function {function.name}), line {function.lineno}")
+
+
+@lru_cache(maxsize=ANNOTATION_CACHE_SIZE)
+def is_valid_string_annotation(annotation: str) -> bool:
+    """
+    Returns True if the string type hint can be parsed as an expression. The results
+    are memoized, since the same strings repeat across a codebase.
+    Parameters
+    ----------
+        annotation (str): content of the string type hint
+    Returns
+    -------
+        bool
+    """
+    try:
+        ast.parse(annotation.strip(), mode="eval")
+    except SyntaxError:
+        return False
+    return True
@@ -0,0 +1,254 @@
+import argparse
+import math
+import os
+import random
+from statistics import NormalDist
+from typing import Dict, List, NamedTuple, Sequence, Union
+
+from type_hint_checker.coverage import COUNTERS, CoverageReport
+
+
+class Estimate(NamedTuple):
+    """
+    Estimated proportion with its confidence interval.
+    Parameters
+    ----------
+        value : float - the estimate
+        lower : float - lower bound of the confidence interval
+        upper : float - upper bound of the confidence interval
+    """
+
+    value: float
+    lower: float
+    upper: float
+
+
+class Stratum(NamedTuple):
+    """
+    Group of files of similar size and the files sampled from it.
+    Parameters
+    ----------
+        size : int - number of all files in the stratum
+        sample : List[str] - the sampled files
+    """
+
+    size: int
+    sample: List[str]
+
+
+def parse_sample_size(value: str) -> Union[float, int]:
+    """
+    Parses the --sample argument: a fraction of the files (a number between 0 and 1
+    with a decimal point) or a number of files (an integer).
+    Parameters
+    ----------
+        value (str): the command line value
+    Returns
+    -------
+        Union[float, int]
+    """
+    try:
+        if "." in value:
+            fraction = float(value)
+            if 0 < fraction <= 1:
+                return fraction
+        elif int(value) > 0:
+            return int(value)
+    except ValueError:
+        pass
+    raise argparse.ArgumentTypeError(
+        f"{value} is neither a fraction in (0, 1] nor a positive number of files"
+    )
+
+
+class Sample:
+    """
+    Reproducible random sample of files, optionally stratified by the file size:
+    the files are split into strata of equal number of files, from the smallest to
+    the largest, and each stratum is sampled proportionally.
+    Parameters
+    ----------
+        files : Sequence[str] - all the files
+        size : Union[float, int] - fraction or number of files to be sampled
+        seed : int - seed of the random number generator
+        strata : int - number of strata by the file size, 1 disables stratification
+    """
+
+    def __init__(
+        self,
+        files: Sequence[str],
+        size: Union[float, int],
+        seed: int = 0,
+        strata: int = 1,
+    ) -> None:
+        self.strata: List[Stratum] = []
+        population = sorted(set(files))
+        if not population:
+            return
+        if strata > 1:
+            population.sort(key=_get_size)
+        sample_size = size if isinstance(size, int) else round(size * len(population))
+        sample_size = min(max(sample_size, 1), len(population))
+        generator = random.Random(seed)
+        strata = max(1, min(strata, sample_size))
+        for number in range(strata):
+            start = number * len(population) // strata
+            end = (number + 1) * len(population) // strata
+            members = population[start:end]
+            stratum_sample_size = min(
+                len(members),
+                max(1, round(sample_size * len(members) / len(population))),
+            )
+            self.strata.append(
+                Stratum(len(members), generator.sample(members, stratum_sample_size))
+            )
+
+    @property
+    def files(self) -> List[str]:
+        """Returns the sampled files"""
+        return [filename for stratum in self.strata for filename in stratum.sample]
+
+    @property
+    def population_size(self) -> int:
+        """Returns the number of all files"""
+        return sum(stratum.size for stratum in self.strata)
+
+    def estimate(
+        self, coverage_report: CoverageReport, confidence: float = 0.95
+    ) -> Dict[str, Estimate]:
+        """
+        Estimates the share of files and functions with missing type hints and the
+        type hint coverage of parameters and returns of all the files, from the
+        coverage of the sampled files. Sampled files missing from the report (e.g.
+        because they could not be parsed) count as files with missing type hints.
+        Parameters
+        ----------
+            coverage_report (CoverageReport): coverage of the sampled files
+            confidence (float): confidence level of the intervals
+        Returns
+        -------
+            Dict[str, Estimate] - the estimates by their descriptions
+        """
+        z_score = NormalDist().inv_cdf((1 + confidence) / 2)
+        totals: Dict[str, List[List[float]]] = {
+            "failed_files": [],
+            "files": [],
+            "failed_functions": [],
+            "functions": [],
+            "annotated_parameters": [],
+            "parameters": [],
+            "annotated_returns": [],
+            "returns": [],
+        }
+        for stratum in self.strata:
+            values: Dict[str, List[float]] = {name: [] for name in totals}
+            for filename in stratum.sample:
+                entry = coverage_report.files.get(os.path.normpath(filename))
+                functions = entry["functions"] if entry else []
+                failed = sum(
+                    function["annotated_parameters"] < function["parameters"]
+                    or not function["has_return"]
+                    for function in functions
+                )
+                values["failed_files"].append(float(entry is None or failed > 0))
+                values["files"].append(1.0)
+                values["failed_functions"].append(failed)
+                values["functions"].append(len(functions))
+                for counter in COUNTERS:
+                    values[counter].append(entry[counter] if entry else 0)
+            for name, stratum_values in values.items():
+                totals[name].append(stratum_values)
+        return {
+            "Files with missing type hints": self.__ratio(
+                totals["failed_files"], totals["files"], z_score
+            ),
+            "Functions with missing type hints": self.__ratio(
+                totals["failed_functions"], totals["functions"], z_score
+            ),
+            "Parameters with type hints": self.__ratio(
+                totals["annotated_parameters"], totals["parameters"], z_score
+            ),
+            "Returns with type hints": self.__ratio(
+                totals["annotated_returns"], totals["returns"], z_score
+            ),
+        }
+
+    def __ratio(
+        self,
+        numerators: List[List[float]],
+        denominators: List[List[float]],
+        z_score: float,
+    ) -> Estimate:
+        """
+        Combined ratio estimator over the strata with its linearized variance, using
+        the finite population correction. The variance cannot be estimated from a
+        single file, so the interval is undefined (nan) if a stratum that was not
+        sampled whole has fewer than two sampled files.
+        Parameters
+        ----------
+            numerators (List[List[float]]): per stratum, per file counted items
+            denominators (List[List[float]]): per stratum, per file all items
+            z_score (float): quantile of the normal distribution for the interval
+        Returns
+        -------
+            Estimate
+        """
+        if not self.population_size:
+            return Estimate(math.nan, math.nan, math.nan)
+        weights = [stratum.size / self.population_size for stratum in self.strata]
+        numerator = sum(
+            weight * _mean(values) for weight, values in zip(weights, numerators)
+        )
+        denominator = sum(
+            weight * _mean(values) for weight, values in zip(weights, denominators)
+        )
+        if not denominator:
+            return Estimate(math.nan, math.nan, math.nan)
+        ratio = numerator / denominator
+        variance = sum(
+            weight**2 * self.__stratum_variance(stratum, ratio, ys, xs)
+            for weight, stratum, ys, xs in zip(
+                weights, self.strata, numerators, denominators
+            )
+        )
+        if math.isnan(variance):
+            return Estimate(ratio, math.nan, math.nan)
+        margin = z_score * math.sqrt(variance) / denominator
+        return Estimate(ratio, max(0.0, ratio - margin), min(1.0, ratio + margin))
+
+    @staticmethod
+    def __stratum_variance(
+        stratum: Stratum, ratio: float, ys: List[float], xs: List[float]
+    ) -> float:
+        """
+        Linearized variance of the mean residual of a stratum, with the finite
+        population correction. Returns nan if it cannot be estimated, i.e. if
+        fewer than two files of a stratum that was not sampled whole were sampled.
+        """
+        sample_size = len(ys)
+        if sample_size == stratum.size:
+            return 0.0
+        if sample_size < 2:
+            return math.nan
+        residuals = [y - ratio * x for y, x in zip(ys, xs)]
+        correction = 1 - sample_size / stratum.size
+        return correction * _variance(residuals) / sample_size
+
+
+def _get_size(filename: str) -> int:
+    """Returns the size of the file, 0 if it cannot be read"""
+    try:
+        return os.path.getsize(filename)
+    except OSError:
+        return 0
+
+
+def _mean(values: List[float]) -> float:
+    """Returns the mean of the values, 0 for no values"""
+    return sum(values) / len(values) if values else 0.0
+
+
+def _variance(values: List[float]) -> float:
+    """Returns the sample variance of the values"""
+    mean = _mean(values)
+    return sum((value - mean) ** 2 for value in values) / (len(values) - 1)
@@ -0,0 +1,144 @@
+import ast
+import hashlib
+import os
+from typing import Dict, FrozenSet, List, Mapping, NamedTuple, Set, Tuple
+
+from type_hint_checker.exceptions import IncorrectFileException
+from type_hint_checker.file_parser import get_parameters
+
+
+class StubSignature(NamedTuple):
+    """
+    Type hints of a function declared in a stub file.
+    Parameters
+    ----------
+        annotated_parameters : FrozenSet[str] - names of the parameters with type hints
+        has_return : bool - True if the return type hint is provided
+    """
+
+    annotated_parameters: FrozenSet[str]
+    has_return: bool
+
+
+class StubIndex:  # pylint: disable=too-few-public-methods
+    """
+    Index of the stub (.pyi) files lying next to the checked python files, built
+    lazily during a single run. Each directory is listed once and each stub file is
+    parsed once, no matter how many times it is looked up.
+    """
+
+    def __init__(self) -> None:
+        self.__directories: Dict[str, FrozenSet[str]] = {}
+        self.__stubs: Dict[str, Mapping[str, StubSignature]] = {}
+        self.__hashes: Dict[str, str] = {}
+
+    def get_signatures(self, filename: str) -> Mapping[str, StubSignature]:
+        """
+        Returns the signatures declared in the stub of a python file.
+        Parameters
+        ----------
+            filename (str): path to the python file
+        Returns
+        -------
+            Mapping[str, StubSignature] - signatures by the qualified function name,
+                                        empty if the file has no stub
+        """
+        stub_path = self.__load_stub(filename)
+        return self.__stubs[stub_path] if stub_path else {}
+
+    def get_content_hash(self, filename: str) -> str:
+        """
+        Returns the hash of the content of the stub of a python file, so that the
+        results relying on the stub can be invalidated when it changes.
+        Parameters
+        ----------
+            filename (str): path to the python file
+        Returns
+        -------
+            str - sha1 of the stub, empty if the file has no stub
+        """
+        stub_path = self.__load_stub(filename)
+        return self.__hashes[stub_path] if stub_path else ""
+
+    def __load_stub(self, filename: str) -> str:
+        """
+        Parses the stub of a python file once and returns its path, or an empty
+        string if the file has no stub.
+        """
+        directory, name = os.path.split(os.path.abspath(filename))
+        stub_name = os.path.splitext(name)[0] + ".pyi"
+        if stub_name not in self.__list_stubs(directory):
+            return ""
+        stub_path = os.path.join(directory, stub_name)
+        if stub_path not in self.__stubs:
+            try:
+                with open(stub_path, "rb") as file:
+                    content = file.read()
+                source = content.decode("utf-8")
+            except (OSError, UnicodeDecodeError) as exc:
+                raise IncorrectFileException(
+                    f"File could not be parsed: {stub_path}"
+                ) from exc
+            self.__stubs[stub_path] = self.__parse_stub(source, stub_path)
+            self.__hashes[stub_path] = hashlib.sha1(content).hexdigest()
+        return stub_path
+
+    def __list_stubs(self, directory: str) -> FrozenSet[str]:
+        """Returns the names of the stub files in the directory"""
+        if directory not in self.__directories:
+            try:
+                with os.scandir(directory) as entries:
+                    stubs = frozenset(
+                        entry.name for entry in entries if entry.name.endswith(".pyi")
+                    )
+            except OSError:
+                stubs = frozenset()
+            self.__directories[directory] = stubs
+        return self.__directories[directory]
+
+    @staticmethod
+    def __parse_stub(source: str, stub_path: str) -> Mapping[str, StubSignature]:
+        """
+        Collects the signatures of the functions and methods declared in a stub.
+        Overloaded declarations are merged.
+        Parameters
+        ----------
+            source (str): content of the stub file
+            stub_path (str): path to the stub file, used in the error message
+        Returns
+        -------
+            Mapping[str, StubSignature] - signatures by the qualified function name
+        """
+        try:
+            body = ast.parse(source).body
+        except (SyntaxError, ValueError) as exc:
+            raise IncorrectFileException(
+                f"File could not be parsed: {stub_path}"
+            ) from exc
+        parameters: Dict[str, Set[str]] = {}
+        returns: Dict[str, bool] = {}
+        pending: List[Tuple[str, ast.stmt]] = [("", statement) for statement in body]
+        while pending:
+            prefix, statement = pending.pop()
+            if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                qualified_name = prefix + statement.name
+                parameters.setdefault(qualified_name, set()).update(
+                    parameter.arg
+                    for parameter in get_parameters(statement.args)
+                    if parameter.annotation
+                )
+                returns[qualified_name] = returns.get(qualified_name, False) or bool(
+                    statement.returns
+                )
+            elif isinstance(statement, ast.ClassDef):
+                pending.extend(
+                    (f"{prefix}{statement.name}.", child) for child in statement.body
+                )
+            elif isinstance(statement, (ast.If, ast.Try)):
+                pending.extend(
+                    (prefix, child) for child in ast.iter_child_nodes(statement)
+                )
+        return {
+            name: StubSignature(frozenset(annotated), returns[name])
+            for name, annotated in parameters.items()
+        }
@@ -0,0 +1,160 @@
+import heapq
+import os
+import re
+from collections import Counter
+from typing import List, Optional, Pattern, Tuple
+
+UNOWNED = "(no owner)"
+CODEOWNERS_DIRECTORIES = (".github", ".gitlab", "docs")
+
+
+class CodeOwners:  # pylint: disable=too-few-public-methods
+    """
+    Owners of the files of a repository, read from a CODEOWNERS file. As on GitHub,
+    the last pattern matching a file determines its owners. The paths are matched
+    relative to the root of the repository, i.e. the directory of the CODEOWNERS
+    file, or its parent if the file lies in `.github/`, `.gitlab/` or `docs/`.
+    Parameters
+    ----------
+        path : str - path to the CODEOWNERS file
+    """
+
+    def __init__(self, path: str) -> None:
+        root = os.path.dirname(os.path.abspath(path))
+        if os.path.basename(root) in CODEOWNERS_DIRECTORIES:
+            root = os.path.dirname(root)
+        self.__root = root
+        self.__rules: List[Tuple[Pattern, Tuple[str, ...]]] = []
+        with open(path, "r", encoding="utf-8") as file:
+            for line in file:
+                fields = line.split("#", 1)[0].split()
+                if fields:
+                    self.__rules.append(
+                        (_compile_pattern(fields[0]), tuple(fields[1:]))
+                    )
+        self.__rules.reverse()
+
+    def get_owners(self, filename: str) -> Tuple[str, ...]:
+        """
+        Returns the owners of a file.
+        Parameters
+        ----------
+            filename (str): path to the file
+        Returns
+        -------
+            Tuple[str, ...] - the owners, empty if the file has none
+        """
+        path = os.path.relpath(os.path.abspath(filename), self.__root)
+        path = path.replace(os.sep, "/")
+        for pattern, owners in self.__rules:
+            if pattern.match(path):
+                return owners
+        return ()
+
+
+def _compile_pattern(pattern: str) -> Pattern:
+    """
+    Translates a CODEOWNERS pattern into a regex matching the paths relative to the
+    root of the repository. A pattern without a slash, except a trailing one,
+    matches at any depth, and a pattern matching a directory matches all the files
+    below it, except for patterns ending with `/*`.
+    """
+    anchored = "/" in pattern.rstrip("/")
+    directory_only = pattern.endswith("/")
+    nested = not pattern.endswith("/*")
+    pattern = pattern.strip("/")
+    regex = []
+    position = 0
+    while position < len(pattern):
+        if pattern.startswith("**/", position):
+            regex.append("(?:.*/)?")
+            position += 3
+        elif pattern.startswith("**", position):
+            regex.append(".*")
+            position += 2
+        elif pattern[position] == "*":
+            regex.append("[^/]*")
+            position += 1
+        elif pattern[position] == "?":
+            regex.append("[^/]")
+            position += 1
+        else:
+            regex.append(re.escape(pattern[position]))
+            position += 1
+    prefix = "" if anchored else "(?:.*/)?"
+    if directory_only:
+        suffix = "/.*"
+    elif nested:
+        suffix = "(?:/.*)?"
+    else:
+        suffix = ""
+    return re.compile(f"{prefix}{''.join(regex)}{suffix}$")
+
+
+class ViolationSummary:
+    """
+    Counts the type hint errors by directory, file and, if the CODEOWNERS are
+    provided, by owner, as the results of the files come in. Only the counters
+    are kept, not the errors themselves.
+    Parameters
+    ----------
+        code_owners : Optional[CodeOwners] - owners of the files
+    """
+
+    def __init__(self, code_owners: Optional[CodeOwners] = None) -> None:
+        self.__code_owners = code_owners
+        self.files_checked = 0
+        self.errors = 0
+        self.by_file: Counter = Counter()
+        self.by_directory: Counter = Counter()
+        self.by_owner: Counter = Counter()
+
+    def add(self, filename: str, errors: int) -> None:
+        """
+        Records the number of errors found in a file.
+        Parameters
+        ----------
+            filename (str): path to the checked file
+            errors (int): number of errors found in the file
+        """
+        self.files_checked += 1
+        if not errors:
+            return
+        self.errors += errors
+        path = os.path.normpath(filename)
+        self.by_file[path] += errors
+        self.by_directory[os.path.dirname(path) or "."] += errors
+        if self.__code_owners is not None:
+            for owner in self.__code_owners.get_owners(filename) or (UNOWNED,):
+                self.by_owner[owner] += errors
+
+    def format_lines(self, top: int = 10) -> List[str]:
+        """
+        Formats the totals and the directories, files and owners with the most
+        errors.
+        Parameters
+        ----------
+            top (int): number of the offenders listed in each group
+        Returns
+        -------
+            List[str] - lines of the summary
+        """
+        lines = [
+            f"Type hint errors: {self.errors} in {len(self.by_file)} of "
+            f"{self.files_checked} checked files"
+        ]
+        groups = [("directories", self.by_directory), ("files", self.by_file)]
+        if self.__code_owners is not None:
+            groups.append(("owners", self.by_owner))
+        for name, counter in groups:
+            if not counter:
+                continue
+            lines.append(f"Top {name}:")
+            for key, count in heapq.nsmallest(top, counter.items(), key=_by_count):
+                lines.append(f"  {count:>6}  {key}")
+        return lines
+
+
+def _by_count(item: Tuple[str, int]) -> Tuple[int, str]:
+    """Sorts the offenders by the number of errors, then alphabetically"""
+    return -item[1], item[0]
@@ -0,0 +1,123 @@
+import argparse
+import ast
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+MINIMUM_TARGET_VERSION = (3, 7)
+ASSIGNMENT_EXPRESSION_VERSION = (3, 8)
+BUILTIN_GENERICS_VERSION = (3, 9)
+UNION_OPERATOR_VERSION = (3, 10)
+BUILTIN_GENERICS = frozenset({"dict", "frozenset", "list", "set", "tuple", "type"})
+
+
+class VersionPolicy(NamedTuple):
+    """
+    Type hint features that can be used with the targeted python version.
+    Parameters
+    ----------
+        union_operator : bool - True if `X | Y` unions are supported (PEP 604)
+        builtin_generics : bool - True if builtin collections can be subscripted,
+                                e.g. `list[int]` (PEP 585)
+    """
+
+    union_operator: bool
+    builtin_generics: bool
+
+
+def parse_target_version(value: str) -> Tuple[int, int]:
+    """
+    Parses a python version given as `major.minor`, e.g. "3.8".
+    Parameters
+    ----------
+        value (str): the version
+    Returns
+    -------
+        Tuple[int, int] - the major and the minor version
+    """
+    parts = value.strip().split(".")
+    if len(parts) != 2 or not all(part.isdigit() for part in parts):
+        raise ValueError(f"{value} is not a python version like 3.8")
+    version = (int(parts[0]), int(parts[1]))
+    if version < MINIMUM_TARGET_VERSION or version[0] != 3:
+        raise ValueError(
+            f"Python {value} is not supported, the oldest supported version is "
+            f"{format_version(MINIMUM_TARGET_VERSION)}"
+        )
+    return version
+
+
+def check_target_version(value: str) -> str:
+    """
+    Validates the --target-version argument, empty if no version is targeted.
+    Parameters
+    ----------
+        value (str): the command line value
+    Returns
+    -------
+        str
+    """
+    if not value:
+        return value
+    try:
+        parse_target_version(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+    return value
+
+
+def format_version(version: Tuple[int, int]) -> str:
+    """Formats a version as `major.minor`"""
+    return ".".join(map(str, version))
+
+
+@lru_cache(maxsize=None)
+def get_version_policy(
+    target_version: str, postponed_annotations: bool = False
+) -> Optional[VersionPolicy]:
+    """
+    Returns the type hint features supported by the targeted python version. The
+    policies are computed once per version.
+    Parameters
+    ----------
+        target_version (str): the targeted version, e.g. "3.8", empty if the type
+                            hints are not checked against any version
+        postponed_annotations (bool): True if the file uses
+                            `from __future__ import annotations`, so the type hints
+                            are never evaluated
+    Returns
+    -------
+        Optional[VersionPolicy] - None if every checked feature is supported
+    """
+    if not target_version or postponed_annotations:
+        return None
+    version = parse_target_version(target_version)
+    policy = VersionPolicy(
+        union_operator=version >= UNION_OPERATOR_VERSION,
+        builtin_generics=version >= BUILTIN_GENERICS_VERSION,
+    )
+    if all(policy):
+        return None
+    return policy
+
+
+def uses_unsupported_syntax(tree: ast.AST, target_version: Tuple[int, int]) -> bool:
+    """
+    Returns True if the tree uses syntax newer than the targeted version that
+    `ast.parse` accepts despite its `feature_version` on python 3.8 and 3.9:
+    assignment expressions and positional-only parameters (PEP 572, PEP 570).
+    Parameters
+    ----------
+        tree (ast.AST): the parsed file
+        target_version (Tuple[int, int]): the targeted version
+    Returns
+    -------
+        bool
+    """
+    if target_version >= ASSIGNMENT_EXPRESSION_VERSION:
+        return False
+    for node in ast.walk(tree):
+        if isinstance(node, ast.NamedExpr):
+            return True
+        if isinstance(node, ast.arguments) and node.posonlyargs:
+            return True
+    return False